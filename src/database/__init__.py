@@ -1,13 +1,22 @@
 """Database package for wine cellar management."""
 
-from .db import get_db_connection, initialize_database
+from .db import (
+    connect, get_db_connection, initialize_database, drop_secondary_indexes, create_secondary_indexes,
+    remove_duplicate_bottles
+)
 from .models import Wine, Bottle, Producer, Region, Tasting, SyncLog
-from .utils import build_update_query
+from .utils import build_update_query, build_upsert_clause, insert_many
 
 __all__ = [
+    'connect',
     'get_db_connection',
     'initialize_database',
+    'drop_secondary_indexes',
+    'create_secondary_indexes',
+    'remove_duplicate_bottles',
     'build_update_query',
+    'build_upsert_clause',
+    'insert_many',
     'Wine',
     'Bottle',
     'Producer',
@@ -8,44 +8,119 @@ from src.utils import logger, get_default_db_path
 
 DEFAULT_DB_PATH = get_default_db_path()
 
+# Read-side indexes the importers never look rows up by. Bulk imports drop them
+# and rebuild them once after loading instead of maintaining them on every insert.
+SECONDARY_INDEXES = {
+    "idx_wines_producer": "wines(producer_id)",
+    "idx_wines_region": "wines(region_id)",
+    "idx_wines_vintage": "wines(vintage)",
+    "idx_wines_type": "wines(wine_type)",
+    "idx_wines_name": "wines(wine_name)",
+    "idx_bottles_status": "bottles(status)",
+    "idx_bottles_location": "bottles(location)",
+    "idx_bottles_consumed_date": "bottles(consumed_date)",
+    "idx_bottles_location_status": "bottles(location, status)",
+    "idx_tastings_personal_rating": "tastings(personal_rating)",
+    "idx_tastings_last_tasted_date": "tastings(last_tasted_date)",
+}
+
+# Indexes made redundant by a UNIQUE constraint or index with the same leading columns.
+# They only add a B-tree update per written row, so they are dropped from existing databases.
+REDUNDANT_INDEXES = ("idx_producers_name", "idx_wines_external_id", "idx_bottles_wine")
+
+# Columns added after the initial schema, applied to existing databases on initialization
+ADDED_COLUMNS = {
+    "wines": {"content_hash": "TEXT"},
+    "bottles": {"content_hash": "TEXT"},
+    "sync_log": {"stats_json": "TEXT"},
+}
+
+# Pre-summed record counts of the sync_log table before stats_json, still present in older databases
+LEGACY_SYNC_LOG_COUNTS = (
+    "records_processed", "records_imported", "records_updated", "records_skipped", "records_failed",
+)
+
+
+# Settings of connections doing bulk writes. WAL (persistent, so it also applies to the
+# app's other connections) makes a commit a sequential append, and NORMAL sync only
+# fsyncs at checkpoints; the rest trade memory for fewer page reads and checkpoints.
+BULK_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "wal_autocheckpoint": 10000,
+}
+
+
+def connect(db_path: str = DEFAULT_DB_PATH, bulk: bool = False) -> sqlite3.Connection:
+    """
+    Open a database connection configured like every connection of the app.
+
+    Args:
+        db_path: Path to SQLite database file
+        bulk: Apply BULK_PRAGMAS, for connections doing imports
+
+    Returns:
+        sqlite3.Connection: Open connection, to be closed by the caller
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    if bulk:
+        for pragma, value in BULK_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
 
 @contextmanager
-def get_db_connection(db_path: str = DEFAULT_DB_PATH):
+def get_db_connection(db_path: str = DEFAULT_DB_PATH, conn: sqlite3.Connection | None = None):
     """
     Context manager for database connections.
 
+    A connection opened here is committed when the block exits without error. A reused
+    connection is yielded as-is and left open and uncommitted, its owner controls the transaction.
+
     Args:
         db_path: Path to SQLite database file
+        conn: Optional open connection to reuse
 
     Yields:
         sqlite3.Connection: Database connection
     """
-    conn = None
+    if conn is not None:
+        yield conn
+        return
+
     try:
-        conn = sqlite3.connect(db_path)
-        conn.execute('PRAGMA foreign_keys = ON')
-        conn.row_factory = sqlite3.Row
+        conn = connect(db_path)
         yield conn
+        conn.commit()
     finally:
         if conn:
             conn.close()
 
 
-def initialize_database(db_path: str = DEFAULT_DB_PATH) -> bool:
+def initialize_database(db_path: str = DEFAULT_DB_PATH, conn: sqlite3.Connection | None = None) -> bool:
     """
     Initialize the wine cellar database with schema.
 
     Args:
         db_path: Path to SQLite database file
+        conn: Optional open connection to reuse
 
     Returns:
         bool: True if successful, False otherwise
+
+    Raises:
+        ValueError: If existing data prevents the schema upgrade, e.g. duplicate bottles
     """
     try:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         logger.info(f"Initializing database at: {db_path}")
 
-        with get_db_connection(db_path) as conn:
+        with get_db_connection(db_path, conn) as conn:
             cursor = conn.cursor()
 
             # Create tables in order of dependencies
@@ -55,6 +130,12 @@ def initialize_database(db_path: str = DEFAULT_DB_PATH) -> bool:
             _create_tastings_table(cursor)
             _create_bottles_table(cursor)
             _create_sync_log_table(cursor)
+            _create_imported_notes_table(cursor)
+            _add_missing_columns(cursor)
+            _backfill_sync_log_stats(cursor)
+            for name in REDUNDANT_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            _create_secondary_indexes(cursor)
             _create_views(cursor)
 
             conn.commit()
@@ -62,6 +143,11 @@ def initialize_database(db_path: str = DEFAULT_DB_PATH) -> bool:
         logger.info(f"✅ Database initialized successfully at: {db_path}")
         return True
 
+    except ValueError as e:
+        # Resolving it needs the user's decision, so callers must not carry on with the old schema
+        logger.error(f"Failed to initialize database: {e}")
+        raise
+
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         return False
@@ -81,7 +167,6 @@ def _create_producers_table(cursor: sqlite3.Cursor):
         )
     """)
 
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_producers_name ON producers(name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_producers_country ON producers(country)")
 
 
@@ -125,8 +210,6 @@ def _create_tastings_table(cursor: sqlite3.Cursor):
     """)
 
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_tastings_wine ON tastings(wine_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tastings_personal_rating ON tastings(personal_rating)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tastings_last_tasted_date ON tastings(last_tasted_date)")
 
 
 def _create_wines_table(cursor: sqlite3.Cursor):
@@ -152,19 +235,13 @@ def _create_wines_table(cursor: sqlite3.Cursor):
             q_purchased             INTEGER DEFAULT 0,
             q_quantity              INTEGER DEFAULT 0,
             q_consumed              INTEGER DEFAULT 0,
+            content_hash            TEXT,
             created_at              TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at              TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             UNIQUE(source, external_id)
         )
     """)
 
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_producer ON wines(producer_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_region ON wines(region_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_vintage ON wines(vintage)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_type ON wines(wine_type)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_name ON wines(wine_name)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wines_external_id ON wines(source, external_id)")
-
 
 def _create_bottles_table(cursor: sqlite3.Cursor):
     """Create bottles table."""
@@ -186,6 +263,7 @@ def _create_bottles_table(cursor: sqlite3.Cursor):
             store_name              TEXT,
             consumed_date           DATE,
             bottle_note             TEXT,
+            content_hash            TEXT,
             created_at              TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at              TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             CHECK(
@@ -195,11 +273,31 @@ def _create_bottles_table(cursor: sqlite3.Cursor):
         )
     """)
 
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bottles_wine ON bottles(wine_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bottles_status ON bottles(status)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bottles_location ON bottles(location)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bottles_consumed_date ON bottles(consumed_date)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bottles_location_status ON bottles(location, status)")
+    # Conflict target of the importers' bottle upserts; databases created before it existed
+    # may hold duplicates, which are only removed on request (see remove_duplicate_bottles)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_bottles_wine_external'")
+    if not cursor.fetchone():
+        if duplicates := _count_duplicate_bottles(cursor):
+            raise ValueError(
+                f"Found {duplicates} bottles with the same wine and external bottle ID as an earlier bottle. "
+                "Run `python -m src.etl.import_cellartracker --remove-duplicate-bottles` to delete them "
+                "(the first imported bottle is kept), then sync again."
+            )
+        cursor.execute(
+            "CREATE UNIQUE INDEX idx_bottles_wine_external ON bottles(wine_id, external_bottle_id)"
+        )
+
+
+def _count_duplicate_bottles(cursor: sqlite3.Cursor) -> int:
+    """Count the bottles sharing their wine and external bottle ID with a bottle of lower ID."""
+    cursor.execute("""
+        SELECT COALESCE(SUM(copies - 1), 0) FROM (
+            SELECT COUNT(*) AS copies FROM bottles
+            WHERE external_bottle_id IS NOT NULL
+            GROUP BY wine_id, external_bottle_id
+        )
+    """)
+    return cursor.fetchone()[0]
 
 
 def _create_sync_log_table(cursor: sqlite3.Cursor):
@@ -212,11 +310,7 @@ def _create_sync_log_table(cursor: sqlite3.Cursor):
             sync_started_at         TIMESTAMP NOT NULL,
             sync_completed_at       TIMESTAMP,
             status                  TEXT NOT NULL,
-            records_processed       INTEGER DEFAULT 0,
-            records_imported        INTEGER DEFAULT 0,
-            records_updated         INTEGER DEFAULT 0,
-            records_skipped         INTEGER DEFAULT 0,
-            records_failed          INTEGER DEFAULT 0,
+            stats_json              TEXT,
             error_message           TEXT,
             error_details           TEXT,
             created_at              TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -228,6 +322,53 @@ def _create_sync_log_table(cursor: sqlite3.Cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_log_date ON sync_log(sync_started_at)")
 
 
+def _create_imported_notes_table(cursor: sqlite3.Cursor):
+    """Create imported_notes table (content hashes of the source notes merged into tastings)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS imported_notes (
+            source                  TEXT NOT NULL,
+            external_note_id        TEXT NOT NULL,
+            content_hash            TEXT NOT NULL,
+            imported_at             TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, external_note_id)
+        )
+    """)
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor):
+    """Add the ADDED_COLUMNS a database created with an older schema is missing."""
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for column, definition in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"Added column {table}.{column}")
+
+
+def _backfill_sync_log_stats(cursor: sqlite3.Cursor):
+    """
+    Store the record totals of syncs logged before stats_json existed (in the LEGACY_SYNC_LOG_COUNTS
+    columns) as their stats_json, so that sync_log_summary keeps reporting them.
+    """
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(sync_log)")}
+    if not existing.issuperset(LEGACY_SYNC_LOG_COUNTS):
+        return
+
+    pairs = ", ".join(f"'{column}', {column}" for column in LEGACY_SYNC_LOG_COUNTS)
+    cursor.execute(f"""
+        UPDATE sync_log SET stats_json = json_object({pairs})
+        WHERE stats_json IS NULL AND sync_completed_at IS NOT NULL
+    """)
+    if cursor.rowcount:
+        logger.info(f"Backfilled the stats of {cursor.rowcount} sync log entries")
+
+
+def _create_secondary_indexes(cursor: sqlite3.Cursor):
+    """Create the read-side indexes listed in SECONDARY_INDEXES."""
+    for name, target in SECONDARY_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
 def _create_views(cursor: sqlite3.Cursor):
     """Create database views."""
 
@@ -301,6 +442,47 @@ def _create_views(cursor: sqlite3.Cursor):
         ORDER BY total_bottles DESC
     """)
 
+    # Sync Log Summary View (record counts aggregated from the importer stats, or the totals
+    # backfilled by _backfill_sync_log_stats), recreated so that databases initialized by an
+    # older version pick up its current columns
+    cursor.execute("DROP VIEW IF EXISTS sync_log_summary")
+    cursor.execute("""
+        CREATE VIEW sync_log_summary AS
+        SELECT
+            s.id,
+            s.source,
+            s.sync_type,
+            s.sync_started_at,
+            s.sync_completed_at,
+            s.status,
+            COALESCE(
+                json_extract(s.stats_json, '$.records_processed'),
+                COALESCE(json_extract(s.stats_json, '$.wines_processed'), 0)
+                    + COALESCE(json_extract(s.stats_json, '$.bottles_processed'), 0)
+            ) as records_processed,
+            COALESCE(
+                json_extract(s.stats_json, '$.records_imported'),
+                COALESCE(json_extract(s.stats_json, '$.wines_imported'), 0)
+                    + COALESCE(json_extract(s.stats_json, '$.bottles_imported'), 0)
+            ) as records_imported,
+            COALESCE(
+                json_extract(s.stats_json, '$.records_updated'),
+                COALESCE(json_extract(s.stats_json, '$.wines_updated'), 0)
+                    + COALESCE(json_extract(s.stats_json, '$.bottles_updated'), 0)
+            ) as records_updated,
+            COALESCE(
+                json_extract(s.stats_json, '$.records_skipped'),
+                COALESCE(json_extract(s.stats_json, '$.wines_skipped'), 0)
+                    + COALESCE(json_extract(s.stats_json, '$.bottles_skipped'), 0)
+            ) as records_skipped,
+            COALESCE(
+                json_extract(s.stats_json, '$.records_failed'), json_array_length(s.stats_json, '$.errors'), 0
+            ) as records_failed,
+            s.stats_json,
+            s.error_message
+        FROM sync_log s
+    """)
+
 
 def drop_all_tables(db_path: str = DEFAULT_DB_PATH) -> bool:
     """
@@ -319,6 +501,8 @@ def drop_all_tables(db_path: str = DEFAULT_DB_PATH) -> bool:
             cursor.execute("DROP VIEW IF EXISTS current_inventory")
             cursor.execute("DROP VIEW IF EXISTS top_rated_wines")
             cursor.execute("DROP VIEW IF EXISTS cellar_stats")
+            cursor.execute("DROP VIEW IF EXISTS sync_log_summary")
+            cursor.execute("DROP TABLE IF EXISTS imported_notes")
             cursor.execute("DROP TABLE IF EXISTS sync_log")
             cursor.execute("DROP TABLE IF EXISTS bottles")
             cursor.execute("DROP TABLE IF EXISTS tastings")
@@ -335,3 +519,83 @@ def drop_all_tables(db_path: str = DEFAULT_DB_PATH) -> bool:
         logger.error(f"Failed to drop tables: {e}")
         return False
 
+
+def drop_secondary_indexes(db_path: str = DEFAULT_DB_PATH, conn: sqlite3.Connection | None = None) -> bool:
+    """
+    Drop the read-side indexes ahead of a bulk import.
+
+    Args:
+        db_path: Path to SQLite database file
+        conn: Optional open connection to reuse
+
+    Returns:
+        bool: True if successful
+    """
+    try:
+        with get_db_connection(db_path, conn) as conn:
+            cursor = conn.cursor()
+            for name in SECONDARY_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+
+        logger.info("Dropped secondary indexes")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to drop secondary indexes: {e}")
+        return False
+
+
+def create_secondary_indexes(db_path: str = DEFAULT_DB_PATH, conn: sqlite3.Connection | None = None) -> bool:
+    """
+    (Re)create the read-side indexes after a bulk import and refresh the query planner statistics.
+
+    Args:
+        db_path: Path to SQLite database file
+        conn: Optional open connection to reuse
+
+    Returns:
+        bool: True if successful
+    """
+    try:
+        with get_db_connection(db_path, conn) as conn:
+            cursor = conn.cursor()
+            _create_secondary_indexes(cursor)
+            cursor.execute("ANALYZE")
+            conn.commit()
+
+        logger.info("Created secondary indexes")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to create secondary indexes: {e}")
+        return False
+
+
+def remove_duplicate_bottles(db_path: str = DEFAULT_DB_PATH, conn: sqlite3.Connection | None = None) -> int:
+    """
+    Delete the bottles sharing their wine and external bottle ID with an earlier bottle, keeping
+    the first imported one (the one later imports kept updating). Databases created before bottles
+    were upserted may hold such duplicates, which block initialize_database until removed.
+
+    Args:
+        db_path: Path to SQLite database file
+        conn: Optional open connection to reuse
+
+    Returns:
+        int: Number of bottles deleted
+    """
+    with get_db_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM bottles
+            WHERE external_bottle_id IS NOT NULL AND id NOT IN (
+                SELECT MIN(id) FROM bottles
+                WHERE external_bottle_id IS NOT NULL
+                GROUP BY wine_id, external_bottle_id
+            )
+        """)
+        conn.commit()
+
+    logger.info(f"Removed {cursor.rowcount} duplicate bottles")
+    return cursor.rowcount
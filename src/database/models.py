@@ -74,6 +74,7 @@ class Wine(BaseModel):
     q_purchased: int = Field(0, description="Quantity purchased (community cellar-data)")
     q_quantity: int = Field(0, description="Quantity currently owned + pending (community cellar-data)")
     q_consumed: int = Field(0, description="Quantity consumed (community cellar-data)")
+    content_hash: str | None = Field(None, description="Hash of the imported source fields")
 
     # Producer and region fields (not in DB, populated via joins)
     producer_name: str | None = Field(None, description="Producer name")
@@ -111,6 +112,7 @@ class Bottle(BaseModel):
     store_name: str | None = Field(None, description="Retailer/store name where purchased")
     consumed_date: date | None = Field(None, description="Date consumed (if status is 'consumed')")
     bottle_note: str | None = Field(None, description="Notes specific to this bottle")
+    content_hash: str | None = Field(None, description="Hash of the imported source fields")
     created_at: datetime | None = Field(None, description="Record creation timestamp")
     updated_at: datetime | None = Field(None, description="Record last update timestamp")
 
@@ -131,6 +133,8 @@ class SyncLog(BaseModel):
     sync_started_at: datetime | None = Field(None, description="Timestamp when sync operation started")
     sync_completed_at: datetime | None = Field(None, description="Timestamp when sync operation completed")
     status: str = Field("", description="Sync status: 'success', 'failed', or 'partial'")
+    stats_json: str | None = Field(None, description="Importer stats as JSON")
+    # Record counts, as aggregated from stats_json by the sync_log_summary view
     records_processed: int = Field(0, description="Total number of records processed")
     records_imported: int = Field(0, description="Number of new records imported")
     records_updated: int = Field(0, description="Number of existing records updated")
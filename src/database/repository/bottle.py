@@ -1,14 +1,30 @@
 """Bottle repository"""
+import sqlite3
 from datetime import datetime, date
 
-from src.database import get_db_connection, build_update_query
+from src.database import get_db_connection, build_update_query, build_upsert_clause, insert_many
 from src.database.models import Bottle
+from src.database.utils import SQLITE_MAX_VARIABLES
 from src.utils import get_default_db_path, logger
 
 
 class BottleRepository:
     """Repository for bottle-related database operations."""
 
+    _INSERT_COLUMNS = (
+        "wine_id", "source", "external_bottle_id", "quantity", "status",
+        "location", "bin", "purchase_date", "purchase_price", "valuation_price", "currency",
+        "store_name", "consumed_date", "bottle_note", "content_hash",
+        "created_at", "updated_at",
+    )
+    _INSERT_QUERY = (
+        f"INSERT INTO bottles ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+    )
+    _UPSERT_CLAUSE = build_upsert_clause(
+        "bottles", ("wine_id", "external_bottle_id"),
+        tuple(c for c in _INSERT_COLUMNS if c not in ("wine_id", "external_bottle_id", "created_at"))
+    )
+
     def __init__(self, db_path: str | None = None):
         """
         Initialize bottle repository.
@@ -37,18 +53,24 @@ class BottleRepository:
                 return Bottle(**dict(row))
             return None
 
-    def get_by_wine_and_external_id(self, wine_id: int, external_bottle_id: str) -> Bottle | None:
+    def get_by_wine_and_external_id(
+        self,
+        wine_id: int,
+        external_bottle_id: str,
+        conn: sqlite3.Connection | None = None
+    ) -> Bottle | None:
         """
         Get bottle by external bottle ID.
 
         Args:
             wine_id: Wine ID
             external_bottle_id: External bottle ID from source system
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Bottle agents or None if not found
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM bottles WHERE wine_id = ? AND external_bottle_id = ?",
@@ -60,6 +82,33 @@ class BottleRepository:
                 return Bottle(**dict(row))
             return None
 
+    def get_content_hashes(
+        self,
+        wine_ids: list[int],
+        conn: sqlite3.Connection | None = None
+    ) -> dict[tuple[int, str], tuple[int, str | None]]:
+        """
+        Get IDs and content hashes of the bottles of the given wines that have an external bottle ID.
+
+        Args:
+            wine_ids: Wine IDs
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Dictionary of (wine ID, external bottle ID) to (bottle ID, content hash)
+        """
+        found = {}
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(wine_ids), SQLITE_MAX_VARIABLES):
+                chunk = wine_ids[start:start + SQLITE_MAX_VARIABLES]
+                cursor.execute(f"""
+                    SELECT wine_id, external_bottle_id, id, content_hash FROM bottles
+                    WHERE wine_id IN ({', '.join('?' * len(chunk))}) AND external_bottle_id IS NOT NULL
+                """, chunk)
+                found.update(((row[0], row[1]), (row[2], row[3])) for row in cursor.fetchall())
+        return found
+
     def get_by_wine(self, wine_id: int, status: str | None = None) -> list[Bottle]:
         """
         Get all bottles for a wine.
@@ -150,45 +199,69 @@ class BottleRepository:
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
-    def create(self, bottle: Bottle) -> int:
+    def create(self, bottle: Bottle, conn: sqlite3.Connection | None = None) -> int:
         """
         Create new bottle record.
 
         Args:
             bottle: Bottle agents
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             ID of created bottle
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO bottles (
-                    wine_id, source, external_bottle_id, quantity, status,
-                    location, bin, purchase_date, purchase_price, valuation_price, currency,
-                    store_name, consumed_date, bottle_note,
-                    created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                bottle.wine_id, bottle.source, bottle.external_bottle_id,
-                bottle.quantity, bottle.status, bottle.location, bottle.bin,
-                bottle.purchase_date, bottle.purchase_price, bottle.valuation_price, bottle.currency,
-                bottle.store_name, bottle.consumed_date, bottle.bottle_note,
-                bottle.created_at or datetime.now(), bottle.updated_at or datetime.now()
-            ))
+            cursor.execute(self._INSERT_QUERY, self._insert_values(bottle))
 
-            conn.commit()
             bottle_id = cursor.lastrowid
-            logger.debug(f"Created bottle for wine_id={bottle.wine_id} (ID: {bottle_id})")
+            logger.debug("Created bottle for wine_id=%s (ID: %s)", bottle.wine_id, bottle_id)
             return bottle_id
 
-    def update(self, bottle: Bottle) -> bool:
+    def upsert_many(self, bottles: list[Bottle], conn: sqlite3.Connection | None = None) -> list[int]:
+        """
+        Insert bottles, or merge them into the existing bottle with the same wine and external bottle ID.
+
+        Existing bottles are merged like update() and left untouched when their content_hash
+        is unchanged. Bottles without an external bottle ID are always inserted.
+
+        Args:
+            bottles: Bottle models
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            IDs of the bottles inserted or updated, in no particular order
+        """
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            rows = insert_many(
+                cursor, "bottles", self._INSERT_COLUMNS, [self._insert_values(b) for b in bottles],
+                self._UPSERT_CLAUSE
+            )
+
+            logger.debug(f"Upserted {len(rows)} bottles")
+            return [row[0] for row in rows]
+
+    @staticmethod
+    def _insert_values(bottle: Bottle) -> tuple:
+        """Row values for _INSERT_COLUMNS."""
+        now = datetime.now()
+        return (
+            bottle.wine_id, bottle.source, bottle.external_bottle_id,
+            bottle.quantity, bottle.status, bottle.location, bottle.bin,
+            bottle.purchase_date, bottle.purchase_price, bottle.valuation_price, bottle.currency,
+            bottle.store_name, bottle.consumed_date, bottle.bottle_note, bottle.content_hash,
+            bottle.created_at or now, bottle.updated_at or now
+        )
+
+    def update(self, bottle: Bottle, conn: sqlite3.Connection | None = None) -> bool:
         """
         Update existing bottle record.
 
         Args:
             bottle: Bottle agents with updated cellar-data
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             True if successful
@@ -196,7 +269,7 @@ class BottleRepository:
         if not bottle.id:
             raise ValueError("Bottle ID is required for update")
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
             update_query, params = build_update_query(
@@ -204,8 +277,7 @@ class BottleRepository:
             )
             cursor.execute(update_query, params)
 
-            conn.commit()
-            logger.debug(f"Updated bottle ID: {bottle.id}")
+            logger.debug("Updated bottle ID: %s", bottle.id)
             return True
 
     def mark_consumed(self, bottle_id: int, consumed_date: date | None = None) -> bool:
@@ -1,7 +1,8 @@
 """Producer repository."""
+import sqlite3
 from datetime import datetime
 
-from src.database import get_db_connection, build_update_query
+from src.database import get_db_connection, build_update_query, insert_many
 from src.database.models import Producer
 from src.utils import get_default_db_path, logger
 
@@ -29,9 +30,9 @@ class ProducerRepository:
                 return Producer(**dict(row))
             return None
 
-    def get_by_name(self, name: str) -> Producer | None:
+    def get_by_name(self, name: str, conn: sqlite3.Connection | None = None) -> Producer | None:
         """Get producer by name (case-insensitive)."""
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM producers WHERE LOWER(name) = LOWER(?)",
@@ -43,7 +44,14 @@ class ProducerRepository:
                 return Producer(**dict(row))
             return None
 
-    def get_or_create(self, name: str, country: str | None = None, region: str | None = None, description: str | None = None) -> int:
+    def get_or_create(
+        self,
+        name: str,
+        country: str | None = None,
+        region: str | None = None,
+        description: str | None = None,
+        conn: sqlite3.Connection | None = None
+    ) -> int:
         """
         Get an existing producer by name or create a new one if the name does not exist.
 
@@ -52,26 +60,52 @@ class ProducerRepository:
             country: Optional country
             region: Optional region
             description: Optional description/notes
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Producer ID
         """
-        existing = self.get_by_name(name)
+        existing = self.get_by_name(name, conn)
         if existing:
             return existing.id
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO producers (name, country, region, description, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (name, country, region, description, datetime.now(), datetime.now()))
 
-            conn.commit()
             producer_id = cursor.lastrowid
             logger.debug(f"Created producer: {name} (ID: {producer_id})")
             return producer_id
 
+    def create_many(self, producers: list[Producer], conn: sqlite3.Connection | None = None) -> list[int]:
+        """
+        Create producer records with multi-row inserts. The new IDs are set on the models.
+
+        Args:
+            producers: Producer models
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            IDs of created producers, in the order of `producers`
+        """
+        now = datetime.now()
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            rows = insert_many(
+                cursor, "producers", ("name", "country", "region", "description", "created_at", "updated_at"),
+                [(p.name, p.country, p.region, p.description, now, now) for p in producers]
+            )
+            # Row IDs grow with insertion order, while RETURNING order is unspecified
+            producer_ids = sorted(row[0] for row in rows)
+            for producer, producer_id in zip(producers, producer_ids):
+                producer.id = producer_id
+
+            logger.debug(f"Created {len(producer_ids)} producers")
+            return producer_ids
+
     def update(self, producer: Producer) -> bool:
         """
         Update existing producer record.
@@ -97,9 +131,9 @@ class ProducerRepository:
             logger.debug(f"Updated producer ID: {producer.id}")
             return True
 
-    def get_all(self) -> list[Producer]:
+    def get_all(self, conn: sqlite3.Connection | None = None) -> list[Producer]:
         """Get all producers."""
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM producers ORDER BY name")
             return [Producer(**dict(row)) for row in cursor.fetchall()]
@@ -1,7 +1,8 @@
 """Region repository."""
+import sqlite3
 from datetime import datetime
 
-from src.database import get_db_connection
+from src.database import get_db_connection, insert_many
 from src.database.models import Region
 from src.utils import get_default_db_path, logger
 
@@ -29,7 +30,13 @@ class RegionRepository:
                 return Region(**dict(row))
             return None
 
-    def get_by_name_and_country(self, primary_name: str, country: str, secondary_name: str | None = None) -> Region | None:
+    def get_by_name_and_country(
+        self,
+        primary_name: str,
+        country: str,
+        secondary_name: str | None = None,
+        conn: sqlite3.Connection | None = None
+    ) -> Region | None:
         """
         Get region by primary name, country, and optional secondary name.
 
@@ -37,11 +44,12 @@ class RegionRepository:
             primary_name: Primary region name
             country: Country name
             secondary_name: Optional secondary region name
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Region agents or None if not found
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
             if secondary_name:
@@ -64,7 +72,14 @@ class RegionRepository:
                 return Region(**dict(row))
             return None
 
-    def get_or_create(self, primary_name: str, country: str, secondary_name: str | None = None, description: str | None = None) -> int:
+    def get_or_create(
+        self,
+        primary_name: str,
+        country: str,
+        secondary_name: str | None = None,
+        description: str | None = None,
+        conn: sqlite3.Connection | None = None
+    ) -> int:
         """
         Get existing region or create new one.
 
@@ -73,29 +88,55 @@ class RegionRepository:
             country: Country name
             secondary_name: Optional secondary region name (e.g., Médoc, Sancerre)
             description: Optional description
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Region ID
         """
-        existing = self.get_by_name_and_country(primary_name, country, secondary_name)
+        existing = self.get_by_name_and_country(primary_name, country, secondary_name, conn)
         if existing:
             return existing.id
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO regions (primary_name, country, secondary_name, description, created_at)
                 VALUES (?, ?, ?, ?, ?)
             """, (primary_name, country, secondary_name, description, datetime.now()))
 
-            conn.commit()
             region_id = cursor.lastrowid
             logger.debug(f"Created region: {primary_name}, {country} (ID: {region_id})")
             return region_id
 
-    def get_all(self) -> list[Region]:
+    def create_many(self, regions: list[Region], conn: sqlite3.Connection | None = None) -> list[int]:
+        """
+        Create region records with multi-row inserts. The new IDs are set on the models.
+
+        Args:
+            regions: Region models
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            IDs of created regions, in the order of `regions`
+        """
+        now = datetime.now()
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            rows = insert_many(
+                cursor, "regions", ("primary_name", "country", "secondary_name", "description", "created_at"),
+                [(r.primary_name, r.country, r.secondary_name, r.description, now) for r in regions]
+            )
+            # Row IDs grow with insertion order, while RETURNING order is unspecified
+            region_ids = sorted(row[0] for row in rows)
+            for region, region_id in zip(regions, region_ids):
+                region.id = region_id
+
+            logger.debug(f"Created {len(region_ids)} regions")
+            return region_ids
+
+    def get_all(self, conn: sqlite3.Connection | None = None) -> list[Region]:
         """Get all regions."""
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM regions ORDER BY country, primary_name")
             return [Region(**dict(row)) for row in cursor.fetchall()]
@@ -1,4 +1,6 @@
 """Sync logs repository"""
+import json
+import sqlite3
 from datetime import datetime
 
 from src.database import get_db_connection
@@ -17,43 +19,38 @@ class SyncLogRepository:
         """
         self.db_path = db_path or get_default_db_path()
 
-    def start_sync_log(self, sync_type: str = 'full') -> int:
-        """Create sync log entry and return ID."""
-        with get_db_connection(self.db_path) as conn:
+    def start_sync_log(self, sync_type: str = 'full', conn: sqlite3.Connection | None = None) -> int:
+        """Create sync log entry and return ID, reusing `conn` if given."""
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO sync_log (
                     source, sync_type, sync_started_at, status
                 ) VALUES (?, ?, ?, ?)
             """, ('cellar_tracker', sync_type, datetime.now(), 'in_progress'))
-            conn.commit()
             return cursor.lastrowid
 
 
-    def complete_sync_log(self, sync_id: int, stats: dict, status: str, error_message: str | None = None):
-        """Update sync log entry with completion status."""
-        with get_db_connection(self.db_path) as conn:
+    def complete_sync_log(
+        self,
+        sync_id: int,
+        stats: dict,
+        status: str,
+        error_message: str | None = None,
+        conn: sqlite3.Connection | None = None
+    ):
+        """
+        Update sync log entry with completion status, reusing `conn` if given.
+
+        The importer stats are stored as JSON, the `sync_log_summary` view aggregates them into record counts.
+        """
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE sync_log SET
                     sync_completed_at = ?,
                     status = ?,
-                    records_processed = ?,
-                    records_imported = ?,
-                    records_updated = ?,
-                    records_skipped = ?,
-                    records_failed = ?,
+                    stats_json = ?,
                     error_message = ?
                 WHERE id = ?
-            """, (
-                datetime.now(),
-                status,
-                stats.get('wines_processed', 0) + stats.get('bottles_processed', 0),
-                stats.get('wines_imported', 0) + stats.get('bottles_imported', 0),
-                stats.get('wines_updated', 0) + stats.get('bottles_updated', 0),
-                stats.get('wines_skipped', 0) + stats.get('bottles_skipped', 0),
-                len(stats['errors']),
-                error_message,
-                sync_id
-            ))
-            conn.commit()
+            """, (datetime.now(), status, json.dumps(stats, default=str), error_message, sync_id))
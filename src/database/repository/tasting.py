@@ -1,14 +1,25 @@
 """Tasting repository."""
+import sqlite3
 from datetime import datetime, date
 
-from src.database import get_db_connection, build_update_query
+from src.database import get_db_connection, build_update_query, insert_many
 from src.database.models import Tasting
+from src.database.utils import SQLITE_MAX_VARIABLES
 from src.utils import get_default_db_path, logger
 
 
 class TastingRepository:
     """Repository for tasting-related database operations."""
 
+    _INSERT_COLUMNS = (
+        "wine_id", "is_defective", "personal_rating", "tasting_notes",
+        "do_like", "community_rating", "like_votes", "like_percentage",
+        "last_tasted_date", "created_at", "updated_at",
+    )
+    _INSERT_QUERY = (
+        f"INSERT INTO tastings ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+    )
+
     def __init__(self, db_path: str | None = None):
         """
         Initialize tasting repository.
@@ -56,17 +67,18 @@ class TastingRepository:
             """, (wine_id,))
             return [Tasting(**dict(row)) for row in cursor.fetchall()]
 
-    def get_latest_by_wine(self, wine_id: int) -> Tasting | None:
+    def get_latest_by_wine(self, wine_id: int, conn: sqlite3.Connection | None = None) -> Tasting | None:
         """
         Get the most recent tasting for a wine.
 
         Args:
             wine_id: Wine ID
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Tasting agents or None if not found
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM tastings 
@@ -80,6 +92,42 @@ class TastingRepository:
                 return Tasting(**dict(row))
             return None
 
+    def get_latest_by_wines(
+        self,
+        wine_ids: list[int],
+        conn: sqlite3.Connection | None = None
+    ) -> dict[int, Tasting]:
+        """
+        Get the most recent tasting for each of the given wines.
+
+        Args:
+            wine_ids: Wine IDs
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Dictionary of wine ID to its latest tasting, for the wines that have one
+        """
+        found = {}
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(wine_ids), SQLITE_MAX_VARIABLES):
+                chunk = wine_ids[start:start + SQLITE_MAX_VARIABLES]
+                cursor.execute(f"""
+                    SELECT * FROM (
+                        SELECT *, ROW_NUMBER() OVER (
+                            PARTITION BY wine_id ORDER BY last_tasted_date DESC, created_at DESC
+                        ) AS recency
+                        FROM tastings
+                        WHERE wine_id IN ({', '.join('?' * len(chunk))})
+                    )
+                    WHERE recency = 1
+                """, chunk)
+                for row in cursor.fetchall():
+                    tasting = dict(row)
+                    del tasting["recency"]
+                    found[tasting["wine_id"]] = Tasting(**tasting)
+        return found
+
     def get_top_rated(
         self,
         min_rating: int = 80,
@@ -180,43 +228,64 @@ class TastingRepository:
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
-    def create(self, tasting: Tasting) -> int:
+    def create(self, tasting: Tasting, conn: sqlite3.Connection | None = None) -> int:
         """
         Create new tasting record.
 
         Args:
             tasting: Tasting agents
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             ID of created tasting
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO tastings (
-                    wine_id, is_defective, personal_rating, tasting_notes,
-                    do_like, community_rating, like_votes, like_percentage,
-                    last_tasted_date, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                tasting.wine_id, tasting.is_defective, tasting.personal_rating,
-                tasting.tasting_notes, tasting.do_like, tasting.community_rating,
-                tasting.like_votes, tasting.like_percentage, tasting.last_tasted_date,
-                tasting.created_at or datetime.now(), tasting.updated_at or datetime.now()
-            ))
+            cursor.execute(self._INSERT_QUERY, self._insert_values(tasting))
 
-            conn.commit()
             tasting_id = cursor.lastrowid
-            logger.debug(f"Created tasting for wine_id={tasting.wine_id} (ID: {tasting_id})")
+            logger.debug("Created tasting for wine_id=%s (ID: %s)", tasting.wine_id, tasting_id)
             return tasting_id
 
-    def update(self, tasting: Tasting) -> bool:
+    def create_many(self, tastings: list[Tasting], conn: sqlite3.Connection | None = None) -> list[int]:
+        """
+        Create tasting records with multi-row inserts.
+
+        Args:
+            tastings: Tasting models
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            IDs of created tastings, in the order of `tastings`
+        """
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            rows = insert_many(cursor, "tastings", self._INSERT_COLUMNS, [self._insert_values(t) for t in tastings])
+            # Row IDs grow with insertion order, while RETURNING order is unspecified
+            tasting_ids = sorted(row[0] for row in rows)
+
+            logger.debug(f"Created {len(tasting_ids)} tastings")
+            return tasting_ids
+
+    @staticmethod
+    def _insert_values(tasting: Tasting) -> tuple:
+        """Row values for _INSERT_COLUMNS."""
+        now = datetime.now()
+        return (
+            tasting.wine_id, tasting.is_defective, tasting.personal_rating,
+            tasting.tasting_notes, tasting.do_like, tasting.community_rating,
+            tasting.like_votes, tasting.like_percentage, tasting.last_tasted_date,
+            tasting.created_at or now, tasting.updated_at or now
+        )
+
+    def update(self, tasting: Tasting, conn: sqlite3.Connection | None = None) -> bool:
         """
         Update existing tasting record.
 
         Args:
             tasting: Tasting agents with updated cellar-data
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             True if successful
@@ -224,7 +293,7 @@ class TastingRepository:
         if not tasting.id:
             raise ValueError("Tasting ID is required for update")
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
             update_query, params = build_update_query(
@@ -232,10 +301,82 @@ class TastingRepository:
             )
             cursor.execute(update_query, params)
 
-            conn.commit()
-            logger.debug(f"Updated tasting ID: {tasting.id}")
+            logger.debug("Updated tasting ID: %s", tasting.id)
             return True
 
+    def update_many(self, tastings: list[Tasting], conn: sqlite3.Connection | None = None) -> int:
+        """
+        Update existing tasting records, with one executemany per distinct set of changed fields.
+
+        Args:
+            tastings: Tasting models with updated cellar-data
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Number of tastings updated
+        """
+        statements = {}
+        for tasting in tastings:
+            if not tasting.id:
+                raise ValueError("Tasting ID is required for update")
+            update_query, params = build_update_query("tastings", tasting, "id")
+            if update_query:
+                statements.setdefault(update_query, []).append(params)
+
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            for update_query, params_list in statements.items():
+                cursor.executemany(update_query, params_list)
+
+            logger.debug(f"Updated {len(tastings)} tastings")
+            return len(tastings)
+
+    def get_note_hashes(
+        self,
+        source: str = "cellar_tracker",
+        conn: sqlite3.Connection | None = None
+    ) -> dict[str, str]:
+        """
+        Get the content hashes of the source notes already merged into tastings.
+
+        Args:
+            source: Source system the notes come from
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Dictionary of external note ID to content hash
+        """
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT external_note_id, content_hash FROM imported_notes WHERE source = ?", (source,)
+            )
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def save_note_hashes(
+        self,
+        note_hashes: list[tuple[str, str]],
+        source: str = "cellar_tracker",
+        conn: sqlite3.Connection | None = None
+    ):
+        """
+        Record the content hashes of source notes merged into tastings.
+
+        Args:
+            note_hashes: (external note ID, content hash) pairs
+            source: Source system the notes come from
+            conn: Optional open connection to reuse instead of opening one
+        """
+        now = datetime.now()
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO imported_notes (source, external_note_id, content_hash, imported_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (source, external_note_id)
+                DO UPDATE SET content_hash = excluded.content_hash, imported_at = excluded.imported_at
+            """, [(source, note_id, note_hash, now) for note_id, note_hash in note_hashes])
+
     def delete(self, tasting_id: int) -> bool:
         """
         Delete tasting record.
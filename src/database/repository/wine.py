@@ -1,15 +1,31 @@
 """Wine repository"""
+import sqlite3
 from datetime import datetime
 
-from src.database import get_db_connection, build_update_query
+from src.database import get_db_connection, build_update_query, build_upsert_clause, insert_many
 from src.database.models import Wine
-from src.database.utils import calculate_similarity
+from src.database.utils import SQLITE_MAX_VARIABLES, calculate_similarity
 from src.utils import get_default_db_path, logger
 
 
 class WineRepository:
     """Repository for wine-related database operations."""
 
+    _INSERT_COLUMNS = (
+        "source", "external_id", "wine_name", "producer_id", "vintage",
+        "wine_type", "varietal", "designation", "region_id", "appellation",
+        "vineyard", "bottle_size", "drink_from_year", "drink_to_year", "drink_index",
+        "q_purchased", "q_quantity", "q_consumed", "content_hash",
+        "created_at", "updated_at",
+    )
+    _INSERT_QUERY = (
+        f"INSERT INTO wines ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+    )
+    _UPSERT_CLAUSE = build_upsert_clause(
+        "wines", ("source", "external_id"),
+        tuple(c for c in _INSERT_COLUMNS if c not in ("source", "external_id", "created_at"))
+    )
+
     def __init__(self, db_path: str | None = None):
         """
         Initialize wine repository.
@@ -53,17 +69,18 @@ class WineRepository:
                 return Wine(**dict(row))
             return None
 
-    def get_by_external_id(self, external_id: str) -> Wine | None:
+    def get_by_external_id(self, external_id: str, conn: sqlite3.Connection | None = None) -> Wine | None:
         """
         Get wine by external ID.
 
         Args:
             external_id: External ID from source system
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             Wine agents or None if not found
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT 
@@ -87,6 +104,36 @@ class WineRepository:
                 return Wine(**dict(row))
             return None
 
+    def get_content_hashes(
+        self,
+        external_ids: list[str],
+        source: str = "cellar_tracker",
+        conn: sqlite3.Connection | None = None
+    ) -> dict[str, tuple[int, str | None]]:
+        """
+        Get IDs and content hashes of existing wines by external ID.
+
+        Args:
+            external_ids: External IDs from source system
+            source: Source system the external IDs belong to
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Dictionary of external ID to (wine ID, content hash) for the wines found
+        """
+        found = {}
+        ids_per_query = SQLITE_MAX_VARIABLES - 1
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(external_ids), ids_per_query):
+                chunk = external_ids[start:start + ids_per_query]
+                cursor.execute(f"""
+                    SELECT external_id, id, content_hash FROM wines
+                    WHERE source = ? AND external_id IN ({', '.join('?' * len(chunk))})
+                """, [source, *chunk])
+                found.update((row[0], (row[1], row[2])) for row in cursor.fetchall())
+        return found
+
     def get_by_name(self, wine_name: str, vintage: int | None = None) -> Wine | None:
         """
         Get wine by name using partial matching.
@@ -133,7 +180,8 @@ class WineRepository:
             return None
 
     def find_duplicates(
-            self, wine_name: str, producer: str, wine_type: str, vintage: int | None, confidence: float = 0.85
+            self, wine_name: str, producer: str, wine_type: str, vintage: int | None, confidence: float = 0.85,
+            conn: sqlite3.Connection | None = None
     ) -> list[Wine] | None:
         """
         Get duplicate wines based on wine name, producer, type, and vintage.
@@ -144,12 +192,14 @@ class WineRepository:
             - Vintage match: 40% (if both have vintage)
             - Confidence threshold: default 85%
 
+        Pass `conn` to reuse an open connection instead of opening one.
+
         Returns:
             List of Wine models that are duplicates or None.
         """
         matches = []
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
             # Get all the wines with same type
@@ -161,6 +211,7 @@ class WineRepository:
             """, (wine_type,))
             existing_wines = cursor.fetchall()
 
+            threshold = 100 * confidence
             for existing in existing_wines:
                 score = 0.0
 
@@ -171,11 +222,18 @@ class WineRepository:
                 elif not vintage and not existing["vintage"]:
                     score += 30
 
+                # The name similarities below add at most 70 points, skip wines that can't reach the threshold
+                if score + 70 < threshold:
+                    continue
+
                 # Producer match
                 if producer and existing["producer_name"]:
                     producer_similarity = calculate_similarity(producer, existing["producer_name"])
                     score += producer_similarity * 30
 
+                if score + 40 < threshold:
+                    continue
+
                 # Wine name match
                 if wine_name and existing["wine_name"]:
                     name_similarity = calculate_similarity(
@@ -184,7 +242,7 @@ class WineRepository:
                     )
                     score += name_similarity * 40
 
-                if score >= 100 * confidence:
+                if score >= threshold:
                     matches.append(
                         (existing["id"], score, existing["wine_name"], existing["producer_name"], existing["vintage"])
                     )
@@ -315,47 +373,73 @@ class WineRepository:
             cursor.execute(query, params)
             return [Wine(**dict(row)) for row in cursor.fetchall()]
 
-    def create(self, wine: Wine) -> int:
+    def create(self, wine: Wine, conn: sqlite3.Connection | None = None) -> int:
         """
         Create new wine record.
 
         Args:
             wine: Wine agents
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             ID of created wine
         """
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO wines (
-                    source, external_id, wine_name, producer_id, vintage,
-                    wine_type, varietal, designation, region_id, appellation,
-                    vineyard, bottle_size, drink_from_year, drink_to_year, drink_index,
-                    q_purchased, q_quantity, q_consumed,
-                    created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                wine.source, wine.external_id, wine.wine_name, wine.producer_id,
-                wine.vintage, wine.wine_type, wine.varietal, wine.designation,
-                wine.region_id, wine.appellation, wine.vineyard, wine.bottle_size,
-                wine.drink_from_year, wine.drink_to_year, wine.drink_index,
-                wine.q_purchased, wine.q_quantity, wine.q_consumed,
-                wine.created_at or datetime.now(), wine.updated_at or datetime.now()
-            ))
+            cursor.execute(self._INSERT_QUERY, self._insert_values(wine))
 
-            conn.commit()
             wine_id = cursor.lastrowid
-            logger.debug(f"Created wine: {wine.wine_name} (ID: {wine_id})")
+            logger.debug("Created wine: %s (ID: %s)", wine.wine_name, wine_id)
             return wine_id
 
-    def update(self, wine: Wine) -> bool:
+    def upsert_many(self, wines: list[Wine], conn: sqlite3.Connection | None = None) -> dict[str, int]:
+        """
+        Insert wines, or merge them into the existing wine with the same source and external ID.
+
+        Existing wines are merged like update() and left untouched when their content_hash
+        is unchanged. The IDs of the inserted or updated wines are set on the models.
+
+        Args:
+            wines: Wine models
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Dictionary of external ID to wine ID for the wines inserted or updated
+        """
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            rows = insert_many(
+                cursor, "wines", self._INSERT_COLUMNS, [self._insert_values(w) for w in wines],
+                self._UPSERT_CLAUSE, "external_id, id"
+            )
+
+            wine_ids = {row[0]: row[1] for row in rows}
+            for wine in wines:
+                wine.id = wine_ids.get(wine.external_id, wine.id)
+            logger.debug(f"Upserted {len(rows)} wines")
+            return wine_ids
+
+    @staticmethod
+    def _insert_values(wine: Wine) -> tuple:
+        """Row values for _INSERT_COLUMNS."""
+        now = datetime.now()
+        return (
+            wine.source, wine.external_id, wine.wine_name, wine.producer_id,
+            wine.vintage, wine.wine_type, wine.varietal, wine.designation,
+            wine.region_id, wine.appellation, wine.vineyard, wine.bottle_size,
+            wine.drink_from_year, wine.drink_to_year, wine.drink_index,
+            wine.q_purchased, wine.q_quantity, wine.q_consumed, wine.content_hash,
+            wine.created_at or now, wine.updated_at or now
+        )
+
+    def update(self, wine: Wine, conn: sqlite3.Connection | None = None) -> bool:
         """
         Update existing wine record.
 
         Args:
             wine: Wine agents with updated cellar-data
+            conn: Optional open connection to reuse instead of opening one
 
         Returns:
             True if successful
@@ -363,17 +447,44 @@ class WineRepository:
         if not wine.id:
             raise ValueError("Wine ID is required for update")
 
-        with get_db_connection(self.db_path) as conn:
+        with get_db_connection(self.db_path, conn) as conn:
             cursor = conn.cursor()
             update_query, params = build_update_query(
                 "wines", wine, "id", ["producer_name", "region_name", "country", "personal_rating", "community_rating", "tasting_notes", "last_tasted_date"]
             )
             cursor.execute(update_query, params)
 
-            conn.commit()
-            logger.debug(f"Updated wine: {wine.wine_name} (ID: {wine.id})")
+            logger.debug("Updated wine: %s (ID: %s)", wine.wine_name, wine.id)
             return True
 
+    def update_drink_indexes(
+        self,
+        drink_indexes: list[tuple[str, float]],
+        source: str = "cellar_tracker",
+        conn: sqlite3.Connection | None = None
+    ) -> int:
+        """
+        Bulk update drink_index for wines identified by external ID.
+
+        Args:
+            drink_indexes: (external_id, drink_index) pairs
+            source: Source system the external IDs belong to
+            conn: Optional open connection to reuse instead of opening one
+
+        Returns:
+            Number of wines whose drink_index changed
+        """
+        now = datetime.now()
+        with get_db_connection(self.db_path, conn) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE wines SET drink_index = ?, updated_at = ?
+                WHERE source = ? AND external_id = ? AND drink_index IS NOT ?
+            """, [(drink_index, now, source, external_id, drink_index) for external_id, drink_index in drink_indexes])
+
+            logger.debug(f"Updated drink_index for {cursor.rowcount} wines")
+            return cursor.rowcount
+
     def delete(self, wine_id: int) -> bool:
         """
         Delete wine record (and cascade to bottles).
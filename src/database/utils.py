@@ -1,11 +1,17 @@
 """Database utility functions."""
+import sqlite3
 import unicodedata
 from datetime import datetime
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 from pydantic import BaseModel
 
 
+# Bound parameter limit of SQLite builds older than 3.32
+SQLITE_MAX_VARIABLES = 999
+
+
 def build_update_query(
         table_name: str, model: BaseModel, id_field: str = "id", exclude_fields: list[str] | None = None
 ) -> tuple[str | None, list | None]:
@@ -42,9 +48,84 @@ def build_update_query(
     return f"UPDATE {table_name} SET {set_clause} WHERE id = ?", params
 
 
+def build_upsert_clause(table_name: str, conflict_columns: tuple[str, ...], update_columns: tuple[str, ...]) -> str:
+    """
+    Build an ON CONFLICT ... DO UPDATE clause that merges like build_update_query:
+    falsy incoming values (NULL, '', 0) keep the stored value. Rows written with a
+    content_hash equal to the stored one are left untouched.
+
+    Args:
+        table_name: Name of the database table
+        conflict_columns: Columns of the unique index the conflict is detected on
+        update_columns: Columns to merge on conflict (updated_at is always overwritten)
+
+    Returns:
+        Clause to append to an INSERT statement
+    """
+    assignments = []
+    for column in update_columns:
+        if column == "updated_at":
+            assignments.append("updated_at = excluded.updated_at")
+            continue
+        assignments.append(
+            f"{column} = CASE WHEN excluded.{column} IS NULL OR excluded.{column} = '' "
+            f"OR (typeof(excluded.{column}) IN ('integer', 'real') AND excluded.{column} = 0) "
+            f"THEN {table_name}.{column} ELSE excluded.{column} END"
+        )
+    return (
+        f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {', '.join(assignments)} "
+        f"WHERE excluded.content_hash IS NULL OR {table_name}.content_hash IS NOT excluded.content_hash"
+    )
+
+
+@lru_cache(maxsize=64)
+def _build_insert_many_query(
+        table_name: str, columns: tuple[str, ...], row_count: int, upsert_clause: str, returning: str
+) -> str:
+    """Build a multi-row INSERT statement for `row_count` rows."""
+    row_placeholders = "(" + ", ".join(["?"] * len(columns)) + ")"
+    values = ", ".join([row_placeholders] * row_count)
+    return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {values} {upsert_clause} RETURNING {returning}"
+
+
+def insert_many(
+        cursor: sqlite3.Cursor,
+        table_name: str,
+        columns: tuple[str, ...],
+        rows: list[tuple],
+        upsert_clause: str = "",
+        returning: str = "id"
+) -> list[tuple]:
+    """
+    Insert rows with multi-row VALUES statements, packing as many rows per statement
+    as fit under SQLITE_MAX_VARIABLES.
+
+    Args:
+        cursor: Cursor of the connection to insert with
+        table_name: Name of the database table
+        columns: Column names, in the order of the row values
+        rows: Row value tuples
+        upsert_clause: Optional ON CONFLICT clause (see build_upsert_clause)
+        returning: Columns to return for every inserted or updated row
+
+    Returns:
+        Returned rows, in no particular order
+    """
+    rows_per_statement = max(1, SQLITE_MAX_VARIABLES // len(columns))
+    returned = []
+    for start in range(0, len(rows), rows_per_statement):
+        chunk = rows[start:start + rows_per_statement]
+        query = _build_insert_many_query(table_name, columns, len(chunk), upsert_clause, returning)
+        cursor.execute(query, [value for row in chunk for value in row])
+        returned.extend(cursor.fetchall())
+    return returned
+
+
+@lru_cache(maxsize=4096)
 def normalize_string(s: str) -> str:
     """
-    Normalize string for comparison by removing accents and extra whitespace.
+    Normalize string for comparison by removing accents and extra whitespace. Results are cached,
+    since duplicate checks compare the same producer and wine names over and over.
 
     Args:
         s: String to normalize
@@ -1,11 +1,24 @@
 """
 CellarTracker API importer for wine cellar database.
 """
-from typing import Dict, List, Optional
-from datetime import datetime, date
+import csv
+import logging
+import re
+import sqlite3
+import string
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from datetime import date
 from cellartracker import cellartracker
+from cellartracker.enum import CellarTrackerFormat, CellarTrackerTable
 
-from src.database import Wine, Bottle, Tasting
+from src.database import (
+    Wine, Bottle, Producer, Region, Tasting, connect, initialize_database, drop_secondary_indexes, create_secondary_indexes
+)
 from src.database.repository import (
     SyncLogRepository, WineRepository, BottleRepository, ProducerRepository, RegionRepository, TastingRepository
 )
@@ -14,16 +27,101 @@ from src.etl.utils import (
     clean_text,
     parse_date,
     parse_vintage,
-    parse_drinking_window, parse_country, parse_float, parse_int, parse_bool
+    parse_drinking_window, parse_country, parse_float, parse_int, parse_bool, chunked, convert_columns,
+    content_hash
 )
 from src.utils import get_default_db_path
 from src.utils.logger import logger
 
 
+DEFAULT_BATCH_SIZE = 1000
+
+# Plain decimal numbers, as CellarTracker exports prices
+_FLOAT_RE = re.compile(r"-?(?:\d+(?:\.\d*)?|\.\d+)")
+
+# Case folding of SQLite's LOWER(), which only folds ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Record fields read when building wines and bottles, in unpacking order
+_WINE_FIELDS = (
+    "iWine", "Wine", "Vintage", "Type", "Producer", "Country", "Locale", "Region", "SubRegion", "Appellation",
+    "Varietal", "Designation", "Vineyard", "Size", "BeginConsume", "EndConsume",
+    "PurchasedCommunity", "QuantityCommunity", "ConsumedCommunity",
+)
+_INVENTORY_BOTTLE_FIELDS = (
+    "Price", "Valuation", "Barcode", "Location", "Bin", "PurchaseDate", "BottleNote", "Currency", "StoreName",
+)
+_BOTTLE_FIELDS = (
+    "Barcode", "Quantity", "BottleState", "ConsumptionDate", "ShortType", "PurchaseDate", "BottleCost",
+    "PurchaseNote", "ConsumptionNote", "Location", "Bin", "BottleCostCurrency", "Store",
+)
+
+# Column converters applied to each batch before records are turned into models
+_WINE_CONVERTERS = {
+    "Wine": clean_text,
+    "Vintage": parse_vintage,
+    "Type": normalize_wine_type,
+    "Producer": clean_text,
+    "Country": parse_country,
+    "Locale": clean_text,
+    "Region": clean_text,
+    "SubRegion": clean_text,
+    "Appellation": clean_text,
+    "Varietal": clean_text,
+    "Designation": clean_text,
+    "Vineyard": clean_text,
+}
+_INVENTORY_CONVERTERS = {
+    **_WINE_CONVERTERS,
+    "Location": clean_text,
+    "Bin": clean_text,
+    "PurchaseDate": parse_date,
+    "BottleNote": clean_text,
+    "StoreName": clean_text,
+}
+# Bottles are written by both the inventory and the bottles phase, so their content_hash is
+# "<inventory hash>:<bottles hash>" and each phase only compares its own part. Rewriting the
+# inventory part clears the bottles part, so the bottles phase re-applies its fields on top.
+_BOTTLE_CONVERTERS = {
+    "Location": clean_text,
+    "Bin": clean_text,
+    "PurchaseDate": parse_date,
+    "PurchaseNote": clean_text,
+    "ConsumptionNote": clean_text,
+    "Store": clean_text,
+}
+
+
+def _fold(value: Optional[str]) -> Optional[str]:
+    """Lookup key matching the repositories' case-insensitive LOWER() comparisons."""
+    return value.translate(_ASCII_LOWER) if value is not None else None
+
+
+def _safe_float(value: Optional[str]) -> Optional[float]:
+    """Parse a price without raising: returns None for blanks and non-numeric text like 'N/A'."""
+    return float(value) if value and _FLOAT_RE.fullmatch(value) else None
+
+
+@lru_cache(maxsize=256)
+def _bottle_status(bottle_state: str, consumed: bool, short_type: Optional[str]) -> str:
+    """Bottle status from a bottles record's BottleState, whether it has a ConsumptionDate, and its ShortType."""
+    if bottle_state == "1" or not consumed:
+        return "in_cellar"
+    short_type = (short_type or "").lower()
+    if "gift" in short_type:
+        return "gifted"
+    if "spoil" in short_type or "dump" in short_type:
+        return "lost"
+    return "consumed"
+
+
 class CellarTrackerImporter:
     """Import wine cellar-data from CellarTracker API."""
 
-    def __init__(self, username: str, password: str, db_path: str = 'cellar-data/wine_cellar.db'):
+    def __init__(
+            self, username: str, password: str, db_path: str = 'cellar-data/wine_cellar.db',
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ):
         """
         Initialize CellarTracker importer.
 
@@ -31,9 +129,11 @@ class CellarTrackerImporter:
             username: CellarTracker username
             password: CellarTracker password
             db_path: Path to SQLite database
+            batch_size: Number of records processed per batch
         """
         self.client = cellartracker.CellarTracker(username, password)
         self.db_path = db_path or get_default_db_path()
+        self.batch_size = batch_size
         self.stats = {
             'wines_processed': 0,
             'wines_imported': 0,
@@ -42,9 +142,11 @@ class CellarTrackerImporter:
             'bottles_processed': 0,
             'bottles_imported': 0,
             'bottles_updated': 0,
+            'bottles_skipped': 0,
             'producers_created': 0,
             'regions_created': 0,
             'notes_processed': 0,
+            'notes_skipped': 0,
             'errors': []
         }
         self.sync_log_repo = SyncLogRepository(self.db_path)
@@ -53,6 +155,15 @@ class CellarTrackerImporter:
         self.producer_repo = ProducerRepository(self.db_path)
         self.region_repo = RegionRepository(self.db_path)
         self.tasting_repo = TastingRepository(self.db_path)
+        # Connection shared by all repository calls while import_all runs
+        self.conn: Optional[sqlite3.Connection] = None
+        # Producer and region IDs by case-folded lookup key, loaded by import_all
+        self._producer_ids: Dict[Optional[str], int] = {}
+        self._region_ids: Dict[tuple, int] = {}
+        # Content hashes of the notes already merged into tastings, by iNote
+        self._note_hashes: Dict[str, str] = {}
+        # Date stamp of undated notes, set when the notes phase starts
+        self._today = date.today().isoformat()
 
     def import_all(self) -> Dict:
         """
@@ -67,38 +178,222 @@ class CellarTrackerImporter:
             Import statistics dictionary
         """
         logger.info("Starting full CellarTracker import")
-        sync_id = self.sync_log_repo.start_sync_log("full")
-
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = connect(self.db_path, bulk=True)
         try:
-            logger.info("Step 1/4: Fetching and importing inventory...")
-            inventory = self.client.get_inventory()
-            self._process_inventory(inventory)
-
-            logger.info("Step 2/4: Fetching and importing availability cellar-data...")
-            available = self.client.get_availability()
-            self._process_availability(available)
+            # Importing into a schema that failed to upgrade would only fail later, far from the cause
+            if not initialize_database(self.db_path, self.conn):
+                raise RuntimeError(f"Failed to initialize database at {self.db_path}, see the log for the cause")
+        except Exception:
+            self.conn.close()
+            self.conn = None
+            raise
+        with self._transaction():
+            sync_id = self.sync_log_repo.start_sync_log("full", conn=self.conn)
 
-            logger.info("Step 2/3: Fetching and importing bottles (complete history)...")
-            bottles = self.client.get_bottles()
-            self._process_bottles(bottles)
-
-            logger.info("Step 3/3: Fetching and importing tasting notes...")
-            notes = self.client.get_notes()
-            self._process_tasting_notes(notes)
-
-            self.sync_log_repo.complete_sync_log(sync_id, self.stats, status="success")
+        try:
+            self._load_lookup_caches()
+
+            # The exports are independent downloads: fetch them all at once, and import each
+            # as soon as it has arrived and the phases before it are done. A phase's transaction
+            # only begins once its export is in, so the write lock is never held over the network.
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                inventory = pool.submit(self._fetch, CellarTrackerTable.Inventory)
+                available = pool.submit(self._fetch, CellarTrackerTable.Availability)
+                bottles = pool.submit(self._fetch, CellarTrackerTable.Bottles)
+                notes = pool.submit(self._fetch, CellarTrackerTable.Notes)
+
+                logger.info("Step 1/4: Fetching and importing inventory...")
+                records = inventory.result()
+                # Only now, so reads keep their indexes while the lookups load and the exports download
+                drop_secondary_indexes(self.db_path, self.conn)
+                with self._transaction():
+                    self._process_inventory(records)
+
+                logger.info("Step 2/4: Fetching and importing availability cellar-data...")
+                records = available.result()
+                with self._transaction():
+                    self._process_availability(records)
+
+                logger.info("Step 2/3: Fetching and importing bottles (complete history)...")
+                records = bottles.result()
+                with self._transaction():
+                    self._process_bottles(records)
+
+                logger.info("Step 3/3: Fetching and importing tasting notes...")
+                records = notes.result()
+                with self._transaction():
+                    self._process_tasting_notes(records)
+
+            with self._transaction():
+                self.sync_log_repo.complete_sync_log(sync_id, self.stats, status="success", conn=self.conn)
             logger.info(f"✅ Import completed successfully!")
 
         except Exception as e:
             error_msg = f"Import failed: {e}"
             logger.error(error_msg)
             self.stats["errors"].append(error_msg)
-            self.sync_log_repo.complete_sync_log(sync_id, self.stats, "failed", error_msg)
+            with self._transaction():
+                self.sync_log_repo.complete_sync_log(sync_id, self.stats, "failed", error_msg, conn=self.conn)
+
+        finally:
+            create_secondary_indexes(self.db_path, self.conn)
+            self.conn.close()
+            self.conn = None
 
         return self.stats
 
 
-    def _process_inventory(self, inventory: List[Dict]):
+    @contextmanager
+    def _transaction(self):
+        """
+        Run an import phase (or sync log write) in a single transaction, rolled back if it fails.
+
+        The write lock is taken up front, so a concurrent writer makes the phase wait for the
+        busy timeout at its start instead of failing with SQLITE_BUSY halfway through. Callers
+        must have their input at hand before entering, other writers are blocked until it exits.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def _fetch(self, table: CellarTrackerTable) -> Iterator[Dict]:
+        """
+        Download a CellarTracker table and parse its records lazily.
+
+        The client's get_* methods build a dict for every record up front; reading the
+        tab-separated export here keeps only its text and the batch being processed in memory.
+        """
+        data = self.client.client.get(table=table, format=CellarTrackerFormat.tab)
+        return csv.DictReader(StringIO(data), dialect="excel-tab")
+
+    def _load_lookup_caches(self):
+        """Load all producer and region IDs once, so wine records resolve them without a query each."""
+        self._producer_ids = {}
+        for producer in sorted(self.producer_repo.get_all(conn=self.conn), key=lambda p: p.id):
+            self._producer_ids.setdefault(_fold(producer.name), producer.id)
+
+        self._region_ids = {}
+        for region in sorted(self.region_repo.get_all(conn=self.conn), key=lambda r: r.id):
+            key = (_fold(region.primary_name), _fold(region.country), _fold(region.secondary_name))
+            self._region_ids.setdefault(key, region.id)
+
+        logger.info(f"Loaded {len(self._producer_ids)} producers and {len(self._region_ids)} regions")
+
+    def _create_missing_lookups(self, records: List[Dict]):
+        """
+        Create the producers and regions of converted wine records that are not cached yet,
+        with one multi-row insert each. Records with incomplete names are left to the
+        resolvers, which report the failure per record.
+        """
+        new_producers = {}
+        new_regions = {}
+        for record in records:
+            producer, country, locale = record.get("Producer"), record.get("Country"), record.get("Locale")
+            key = _fold(producer)
+            if producer and key not in self._producer_ids and key not in new_producers:
+                new_producers[key] = Producer(name=producer, country=country, region=locale)
+
+            region, secondary_name = record.get("Region"), record.get("SubRegion") or record.get("Appellation")
+            key = (_fold(region), _fold(country), _fold(secondary_name) if secondary_name else None)
+            if region and country and key not in self._region_ids and key not in new_regions:
+                new_regions[key] = Region(primary_name=region, country=country, secondary_name=secondary_name)
+
+        for producer in self._write_all(
+            list(new_producers.values()), self.producer_repo.create_many, lambda p: f"producer {p.name}"
+        ):
+            self._producer_ids[_fold(producer.name)] = producer.id
+            self.stats["producers_created"] += 1
+
+        for region in self._write_all(
+            list(new_regions.values()), self.region_repo.create_many, lambda r: f"region {r.primary_name}"
+        ):
+            key = (_fold(region.primary_name), _fold(region.country),
+                   _fold(region.secondary_name) if region.secondary_name else None)
+            self._region_ids[key] = region.id
+            self.stats["regions_created"] += 1
+
+    def _resolve_producer(self, name: Optional[str], country: Optional[str], locale: Optional[str]) -> int:
+        """Get the producer ID from the cache, creating the producer on a miss."""
+        key = _fold(name)
+        producer_id = self._producer_ids.get(key)
+        if producer_id is None:
+            producer_id = self.producer_repo.get_or_create(name, country, locale, conn=self.conn)
+            self._producer_ids[key] = producer_id
+            self.stats["producers_created"] += 1
+        return producer_id
+
+    def _resolve_region(self, primary_name: Optional[str], country: Optional[str], secondary_name: Optional[str]) -> int:
+        """Get the region ID from the cache, creating the region on a miss."""
+        key = (_fold(primary_name), _fold(country), _fold(secondary_name) if secondary_name else None)
+        region_id = self._region_ids.get(key)
+        if region_id is None:
+            region_id = self.region_repo.get_or_create(primary_name, country, secondary_name, conn=self.conn)
+            self._region_ids[key] = region_id
+            self.stats["regions_created"] += 1
+        return region_id
+
+    def _process_in_batches(
+            self, records: Iterable[Dict], process_batch: Callable[[List[Dict]], None], label: str
+    ):
+        """
+        Feed records to a batch handler in chunks of `batch_size` without materializing the whole stream.
+
+        Args:
+            records: Records from a CellarTracker table (list or any iterable)
+            process_batch: Handler called with each chunk of records
+            label: Record description used in the progress log
+        """
+        count = 0
+        for batch in chunked(records, self.batch_size):
+            process_batch(batch)
+            count += len(batch)
+        logger.info(f"Processed {count} {label}")
+
+    def _write_all(self, models: List, write_many: Callable, describe: Callable[[object], str]) -> List:
+        """
+        Write models with multi-row statements. If a statement fails (e.g. one row violates a
+        constraint), fall back to writing them one by one so only the offending rows are lost.
+
+        Args:
+            models: Models to write
+            write_many: Repository bulk insert or upsert
+            describe: Describes a model for error messages
+
+        Returns:
+            The written models
+        """
+        if not models:
+            return []
+
+        # Lets a failed bulk write discard the chunks written before the failing one
+        # without rolling back the rest of the phase's transaction
+        self.conn.execute("SAVEPOINT write_all")
+        try:
+            write_many(models, conn=self.conn)
+            self.conn.execute("RELEASE write_all")
+            return models
+        except sqlite3.Error as e:
+            self.conn.execute("ROLLBACK TO write_all")
+            self.conn.execute("RELEASE write_all")
+            logger.debug(f"Bulk write of {len(models)} rows failed ({e}), writing one by one")
+
+        written = []
+        for model in models:
+            try:
+                write_many([model], conn=self.conn)
+                written.append(model)
+            except Exception as e:
+                error_msg = f"Error processing {describe(model)}: {e}"
+                logger.error(error_msg)
+                self.stats["errors"].append(error_msg)
+        return written
+
+    def _process_inventory(self, inventory: Iterable[Dict]):
         """
         Process inventory - the current cellar snapshot.
 
@@ -106,181 +401,305 @@ class CellarTrackerImporter:
         - Wine entities with catalog info (name, producer, vintage, type, etc.)
         - Bottle entities for current cellar (location, purchase info, status='in_cellar')
         """
-        logger.info(f"Processing {len(inventory)} bottles from inventory")
+        self._process_in_batches(inventory, self._process_inventory_batch, "inventory records")
+
+    def _process_inventory_batch(self, batch: List[Dict]):
+        """Process one batch of inventory records."""
+        conn = self.conn
+        stats = self.stats
+        errors_append = stats["errors"].append
+        build_wine = self._get_wine_object_from_inventory_record
+        build_bottle = self._get_bottle_object_from_inventory_record
+        debug = logger.debug
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        records = convert_columns(batch, _INVENTORY_CONVERTERS)
+        self._create_missing_lookups(records)
+
+        # Wines: one lookup tells new, changed and unchanged wines apart, the new
+        # and changed ones are written with a single upsert
+        existing_wines = self.wine_repo.get_content_hashes(
+            list(dict.fromkeys(record.get("iWine") for record in records)), conn=conn
+        )
+        wine_hashes = {iwine: content_hash for iwine, (_, content_hash) in existing_wines.items()}
+        wine_ids = {}
+        changed_wines = []
+        wines_skipped = 0
+        for record in records:
+            try:
+                wine = build_wine(record)
+                iwine = wine.external_id
+                if iwine in existing_wines:
+                    wine_ids[iwine] = existing_wines[iwine][0]
+                if iwine in wine_hashes and wine_hashes[iwine] == wine.content_hash:
+                    wines_skipped += 1
+                    continue
+                wine_hashes[iwine] = wine.content_hash
+                changed_wines.append(wine)
+            except Exception as e:
+                error_msg = f"Error processing inventory record {record.get('iWine')}/{record.get('Barcode')}: {e}"
+                logger.error(error_msg)
+                errors_append(error_msg)
+
+        known_wines = set(existing_wines)
+        wines_imported = wines_updated = 0
+        for wine in self._write_all(
+            changed_wines, self.wine_repo.upsert_many, lambda w: f"inventory wine {w.external_id}"
+        ):
+            if wine.id:
+                wine_ids[wine.external_id] = wine.id
+            if wine.external_id in known_wines:
+                wines_updated += 1
+                debug("Updated wine: %s (%s)", wine.wine_name, wine.vintage)
+            else:
+                known_wines.add(wine.external_id)
+                wines_imported += 1
+                debug("Imported wine: %s (%s)", wine.wine_name, wine.vintage)
+
+        stats["wines_processed"] += len(records)
+        stats["wines_skipped"] += wines_skipped
+        stats["wines_imported"] += wines_imported
+        stats["wines_updated"] += wines_updated
+
+        # Bottles: same split, wines that failed above are skipped
+        bottle_hashes = {
+            key: content_hash or "" for key, (_, content_hash) in self.bottle_repo.get_content_hashes(
+                [wine_id for wine_id, _ in existing_wines.values()], conn=conn
+            ).items()
+        }
+        changed_bottles = []
+        for record in records:
+            wine_id = wine_ids.get(record.get("iWine"))
+            if wine_id is None:
+                continue
 
-        for record in inventory:
             try:
-                self.stats["wines_processed"] += 1
-                iwine = record.get("iWine")
-                wine = self._get_wine_object_from_inventory_record(record)
-                if existing := self.wine_repo.get_by_external_id(iwine):
-                    wine.id = existing.id
-                    wine_id = existing.id
-                    self.wine_repo.update(wine)
-                    self.stats["wines_updated"] += 1
-                    logger.debug(f"Updated wine: {wine.wine_name} ({wine.vintage})")
-                else:
-                    wine_id = self.wine_repo.create(wine)
-                    self.stats["wines_imported"] += 1
-                    logger.debug(f"Imported wine: {wine.wine_name} ({wine.vintage})")
-
-                bottle = self._get_bottle_object_from_inventory_record(record, wine_id)
-                barcode = record.get("Barcode")
-                if existing := self.bottle_repo.get_by_wine_and_external_id(wine_id, barcode):
-                    bottle.id = existing.id
-                    self.bottle_repo.update(bottle)
-                    logger.debug(f"Updated bottle: {barcode}")
-                else:
-                    bottle.quantity = 1
-                    bottle.status = "in_cellar"
-                    self.bottle_repo.create(bottle)
-                    logger.debug(f"Imported bottle: {barcode}")
+                bottle = build_bottle(record, wine_id)
+                key = (wine_id, bottle.external_bottle_id)
+                inventory_hash = bottle.content_hash
+                if key in bottle_hashes and bottle_hashes[key].partition(":")[0] == inventory_hash:
+                    continue
+                bottle.content_hash = f"{inventory_hash}:"
+                if bottle.external_bottle_id:
+                    bottle_hashes[key] = bottle.content_hash
+                changed_bottles.append(bottle)
             except Exception as e:
                 error_msg = f"Error processing inventory record {record.get('iWine')}/{record.get('Barcode')}: {e}"
                 logger.error(error_msg)
-                self.stats["errors"].append(error_msg)
+                errors_append(error_msg)
+
+        written_bottles = self._write_all(
+            changed_bottles, self.bottle_repo.upsert_many,
+            lambda b: f"inventory bottle {b.external_bottle_id}",
+        )
+        if debug_enabled:
+            for bottle in written_bottles:
+                debug("Upserted bottle: %s", bottle.external_bottle_id)
 
 
-    def _process_availability(self, available: List[Dict]):
+    def _process_availability(self, available: Iterable[Dict]):
         """
         Process availability cellar-data - Updates wine catalog with drinking index scores.
 
         Updates Wine entities with:
         - drink_index (availability score from Available column, converted to 0-100 scale)
         """
-        logger.info(f"Processing {len(available)} wines from availability cellar-data")
+        self._process_in_batches(available, self._process_availability_batch, "availability records")
+
+    def _process_availability_batch(self, batch: List[Dict]):
+        """Process one batch of availability records with a single bulk update."""
+        drink_indexes = []
+        for record in batch:
+            iwine = record.get("iWine")
+            available = record.get("Available")
+            if not available:
+                continue
+
+            drink_index = parse_float(available)
+            if drink_index is None:
+                logger.warning(f"Could not parse available score '{available}' for wine {iwine}")
+                continue
+            drink_indexes.append((iwine, drink_index))
+
+        if not drink_indexes:
+            return
 
-        for record in available:
-            try:
-                iwine = record.get("iWine")
-                wine = self.wine_repo.get_by_external_id(iwine)
-
-                if not wine:
-                    logger.debug(f"Wine {iwine} not found in availability processing, skipping")
-                    continue
-
-                drink_index = record.get("Available")
-                if drink_index:
-                    try:
-                        if drink_index != wine.drink_index:
-                            wine.drink_index = drink_index
-                            self.wine_repo.update(wine)
-                            logger.debug(f"Updated drink_index for wine {iwine}: {drink_index}")
-                    except (ValueError, TypeError):
-                        logger.warning(f"Could not parse available score '{drink_index}' for wine {iwine}")
-
-            except Exception as e:
-                error_msg = f"Error processing availability record for wine {record.get('iWine')}: {e}"
-                logger.error(error_msg)
-                self.stats["errors"].append(error_msg)
+        try:
+            updated = self.wine_repo.update_drink_indexes(drink_indexes, conn=self.conn)
+            logger.debug(f"Updated drink_index for {updated} of {len(drink_indexes)} wines")
+        except Exception as e:
+            error_msg = f"Error processing availability batch: {e}"
+            logger.error(error_msg)
+            self.stats["errors"].append(error_msg)
 
 
-    def _process_bottles(self, bottles: List[Dict]):
+    def _process_bottles(self, bottles: Iterable[Dict]):
         """
         Process bottles - Complete bottle lifecycle.
 
         Creates/Updates:
         - Bottle: Complete lifecycle (in_cellar, consumed, gifted, lost)
         """
-        logger.info(f"Processing {len(bottles)} bottles from complete lifecycle")
-
-        for record in bottles:
-            self.stats["bottles_processed"] += 1
+        self._process_in_batches(bottles, self._process_bottles_batch, "bottle records")
+
+    def _process_bottles_batch(self, batch: List[Dict]):
+        """Process one batch of bottle records."""
+        conn = self.conn
+        stats = self.stats
+        errors_append = stats["errors"].append
+        build_wine = self._get_wine_object_from_inventory_record
+        build_bottle = self._get_bottle_object_from_bottles_record
+        debug = logger.debug
+
+        records = convert_columns(batch, _BOTTLE_CONVERTERS)
+        wine_ids = {
+            iwine: wine_id for iwine, (wine_id, _) in self.wine_repo.get_content_hashes(
+                list(dict.fromkeys(record.get("iWine") for record in records)), conn=conn
+            ).items()
+        }
 
+        # Wines missing from the inventory are created from their bottle records
+        orphan_records = {}
+        for record in records:
+            iwine = record.get("iWine")
+            if iwine not in wine_ids and iwine not in orphan_records:
+                orphan_records[iwine] = record
+        orphan_records = convert_columns(list(orphan_records.values()), _WINE_CONVERTERS)
+        self._create_missing_lookups(orphan_records)
+
+        orphan_wines = []
+        for record in orphan_records:
             try:
-                iwine = record.get("iWine")
-                wine = self.wine_repo.get_by_external_id(iwine)
-
-                if not wine:
-                    wine = self._get_wine_object_from_inventory_record(record)
-                    wine_id = self.wine_repo.create(wine)
-                    self.stats["wines_processed"] += 1
-                    self.stats["wines_imported"] += 1
-                    logger.debug(f"Created wine from bottles: {wine.wine_name}")
-                else:
-                    wine_id = wine.id
-
-                bottle = self._get_bottle_object_from_bottles_record(record, wine_id)
-                barcode = record.get("Barcode")
+                orphan_wines.append(build_wine(record))
+            except Exception as e:
+                error_msg = f"Error processing bottle {record.get('Barcode')}: {e}"
+                logger.error(error_msg)
+                errors_append(error_msg)
 
-                if existing := self.bottle_repo.get_by_wine_and_external_id(wine_id, barcode):
-                    bottle.id = existing.id
-                    self.bottle_repo.update(bottle)
-                    self.stats["bottles_updated"] += 1
-                    logger.debug(f"Updated bottle from bottles: {barcode}")
-                else:
-                    self.bottle_repo.create(bottle)
-                    self.stats["bottles_imported"] += 1
-                    logger.debug(f"Imported bottle from bottles: {barcode}")
+        written_wines = self._write_all(
+            orphan_wines, self.wine_repo.upsert_many, lambda w: f"bottle wine {w.external_id}"
+        )
+        for wine in written_wines:
+            wine_ids[wine.external_id] = wine.id
+            debug("Created wine from bottles: %s", wine.wine_name)
+        stats["wines_processed"] += len(written_wines)
+        stats["wines_imported"] += len(written_wines)
+
+        existing_bottles = self.bottle_repo.get_content_hashes(list(wine_ids.values()), conn=conn)
+        bottle_hashes = {key: content_hash or "" for key, (_, content_hash) in existing_bottles.items()}
+        changed_bottles = []
+        bottles_skipped = 0
+        for record in records:
+            wine_id = wine_ids.get(record.get("iWine"))
+            if wine_id is None:
+                continue
 
+            try:
+                bottle = build_bottle(record, wine_id)
+                key = (wine_id, bottle.external_bottle_id)
+                stored_hash = bottle_hashes.get(key)
+                inventory_hash = (stored_hash or "").partition(":")[0]
+                bottle.content_hash = f"{inventory_hash}:{bottle.content_hash}"
+                if stored_hash == bottle.content_hash:
+                    bottles_skipped += 1
+                    continue
+                if bottle.external_bottle_id:
+                    bottle_hashes[key] = bottle.content_hash
+                changed_bottles.append(bottle)
             except Exception as e:
                 error_msg = f"Error processing bottle {record.get('Barcode')}: {e}"
                 logger.error(error_msg)
-                self.stats["errors"].append(error_msg)
+                errors_append(error_msg)
+
+        known_bottles = set(existing_bottles)
+        bottles_imported = bottles_updated = 0
+        for bottle in self._write_all(
+            changed_bottles, self.bottle_repo.upsert_many, lambda b: f"bottle {b.external_bottle_id}"
+        ):
+            key = (bottle.wine_id, bottle.external_bottle_id)
+            if key in known_bottles:
+                bottles_updated += 1
+                debug("Updated bottle from bottles: %s", bottle.external_bottle_id)
+            else:
+                if bottle.external_bottle_id:
+                    known_bottles.add(key)
+                bottles_imported += 1
+                debug("Imported bottle from bottles: %s", bottle.external_bottle_id)
+
+        stats["bottles_processed"] += len(records)
+        stats["bottles_skipped"] += bottles_skipped
+        stats["bottles_imported"] += bottles_imported
+        stats["bottles_updated"] += bottles_updated
 
 
-    def _process_tasting_notes(self, notes: List[Dict]):
+    def _process_tasting_notes(self, notes: Iterable[Dict]):
         """
         Process notes - Tasting notes and ratings.
 
-        Creates/Updates Tasting entities linked to Wines.
+        Creates/Updates Tasting entities linked to Wines. Notes merged by an earlier sync
+        and unchanged since are skipped.
         """
-        logger.info(f"Processing {len(notes)} tasting notes")
+        self._note_hashes = self.tasting_repo.get_note_hashes(conn=self.conn)
+        self._today = date.today().isoformat()
+        self._process_in_batches(notes, self._process_tasting_notes_batch, "tasting notes")
+
+    def _process_tasting_notes_batch(self, batch: List[Dict]):
+        """Process one batch of tasting notes."""
+        from_iso = date.fromisoformat
+        conn = self.conn
+        stats = self.stats
+        errors_append = stats["errors"].append
+        extract_rating = self._extract_rating_from_note
+        extract_notes = self._extract_tasting_notes_from_note
+        merge_note = self._merge_note_into_tasting
+        note_hashes = self._note_hashes
+        debug = logger.debug
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        wine_ids = {
+            iwine: wine_id for iwine, (wine_id, _) in self.wine_repo.get_content_hashes(
+                list(dict.fromkeys(record.get("iWine") for record in batch)), conn=conn
+            ).items()
+        }
 
-        for record in notes:
-            self.stats["notes_processed"] += 1
+        # New tastings are inserted together; later notes of the same wine merge into them.
+        # Existing tastings are loaded with one query, merged in memory and the changed ones
+        # written together as well.
+        existing_tastings = self.tasting_repo.get_latest_by_wines(list(set(wine_ids.values())), conn=conn)
+        new_tastings = {}
+        changed_tastings = {}
+        # (iNote, content hash) of the merged notes, by wine
+        merged_notes = {}
+        notes_skipped = 0
+        for record in batch:
             try:
                 iwine = record.get("iWine")
-                wine = self.wine_repo.get_by_external_id(iwine)
+                wine_id = wine_ids.get(iwine)
 
-                if not wine:
+                if not wine_id:
                     logger.warning(f"Wine {iwine} not found for note update")
                     continue
 
-                wine_id = wine.id
-                existing_tasting = self.tasting_repo.get_latest_by_wine(wine_id)
-
-                if existing_tasting:
-                    updated = False
-
-                    # Merge ratings (keep highest)
-                    new_rating = self._extract_rating_from_note(record)
-                    if new_rating and (not existing_tasting.personal_rating or new_rating > existing_tasting.personal_rating):
-                        existing_tasting.personal_rating = new_rating
-                        updated = True
-
-                    # Merge tasting notes (append with date stamp)
-                    new_notes = self._extract_tasting_notes_from_note(record, existing_tasting.tasting_notes or "")
-                    if new_notes != existing_tasting.tasting_notes:
-                        existing_tasting.tasting_notes = new_notes
-                        updated = True
-
-                    # Update tasting date (keep most recent)
-                    tasting_date_str = parse_date(record.get("TastingDate"))
-                    if tasting_date_str:
-                        from datetime import date as date_cls
-                        tasting_date = date_cls.fromisoformat(tasting_date_str)
-                        if not existing_tasting.last_tasted_date or tasting_date > existing_tasting.last_tasted_date:
-                            existing_tasting.last_tasted_date = tasting_date
-                            updated = True
-
-                    is_defective = record.get("Defective", False)
-                    if is_defective and not existing_tasting.is_defective:
-                        existing_tasting.is_defective = True
-                        updated = True
-
-                    if updated:
-                        self.tasting_repo.update(existing_tasting)
-                        logger.debug(f"Updated tasting for wine {iwine}")
+                inote = record.get("iNote")
+                note_hash = content_hash(wine_id, *record.values())
+                if inote and note_hashes.get(inote) == note_hash:
+                    notes_skipped += 1
+                    continue
+
+                tasting_date_str = parse_date(record.get("TastingDate"))
+                if pending_tasting := new_tastings.get(wine_id):
+                    merge_note(pending_tasting, record, tasting_date_str)
+                elif existing_tasting := existing_tastings.get(wine_id):
+                    if merge_note(existing_tasting, record, tasting_date_str):
+                        changed_tastings[wine_id] = existing_tasting
                 else:
-                    tasting_date_str = parse_date(record.get("TastingDate"))
-                    tasting_date = date.fromisoformat(tasting_date_str) if tasting_date_str else None
+                    tasting_date = from_iso(tasting_date_str) if tasting_date_str else None
 
-                    tasting = Tasting(
+                    new_tastings[wine_id] = Tasting(
                         wine_id=wine_id,
                         is_defective=parse_bool(record.get("Defective")),
-                        personal_rating=self._extract_rating_from_note(record),
-                        tasting_notes=self._extract_tasting_notes_from_note(record, ""),
+                        personal_rating=extract_rating(record),
+                        tasting_notes=extract_notes(record, "", tasting_date_str),
                         do_like=parse_bool(record.get("fLikeIt")),
                         community_rating=parse_float(record.get("CScore")),
                         like_votes= parse_int(record.get("LikeVotes")),
@@ -288,46 +707,98 @@ class CellarTrackerImporter:
                         last_tasted_date=tasting_date,
 
                     )
-                    self.tasting_repo.create(tasting)
-                    logger.debug(f"Created tasting for wine {iwine}")
+
+                # Only notes merged without error are remembered, failed ones are retried next sync
+                if inote:
+                    merged_notes.setdefault(wine_id, []).append((inote, note_hash))
 
             except Exception as e:
                 error_msg = f"Error processing note {record.get('iNote')}: {e}"
                 logger.error(error_msg)
-                self.stats['errors'].append(error_msg)
+                errors_append(error_msg)
 
+        stats["notes_processed"] += len(batch)
+        stats["notes_skipped"] += notes_skipped
 
-    def _get_wine_object_from_inventory_record(self, record: Dict) -> Wine:
+        updated_tastings = self._write_all(
+            list(changed_tastings.values()), self.tasting_repo.update_many, lambda t: f"tasting {t.id}"
+        )
+        created_tastings = self._write_all(
+            list(new_tastings.values()), self.tasting_repo.create_many, lambda t: f"tasting for wine {t.wine_id}"
+        )
+
+        # Remember the notes whose tasting was written (or did not need to be)
+        failed_wines = (
+            {t.wine_id for t in changed_tastings.values()} - {t.wine_id for t in updated_tastings}
+        ) | (set(new_tastings) - {t.wine_id for t in created_tastings})
+        saved_notes = [
+            note for wine_id, notes in merged_notes.items() if wine_id not in failed_wines for note in notes
+        ]
+        self.tasting_repo.save_note_hashes(saved_notes, conn=conn)
+        note_hashes.update(saved_notes)
+
+        if debug_enabled:
+            for tasting in updated_tastings:
+                debug("Updated tasting for wine %s", tasting.wine_id)
+            for tasting in created_tastings:
+                debug("Created tasting for wine %s", tasting.wine_id)
+
+    def _merge_note_into_tasting(self, tasting: Tasting, record: Dict, tasting_date_str: Optional[str]) -> bool:
         """
-        Create a Wine object from an inventory record.
+        Merge a note record into an existing tasting.
+
+        Args:
+            tasting: Tasting to update in place
+            record: Note record
+            tasting_date_str: The record's TastingDate, already parsed
+
+        Returns:
+            True if the tasting changed
         """
-        iwine = record.get("iWine")
-        wine_name = clean_text(record.get("Wine", ""))
-        vintage = parse_vintage(record.get("Vintage"))
-        wine_type = normalize_wine_type(record.get("Type", ""))
+        updated = False
 
-        producer_id = self.producer_repo.get_or_create(
-            clean_text(record.get("Producer", "")),
-            parse_country(record.get("Country")),
-            clean_text(record.get("Locale")),
-        )
+        # Merge ratings (keep highest)
+        new_rating = self._extract_rating_from_note(record)
+        if new_rating and (not tasting.personal_rating or new_rating > tasting.personal_rating):
+            tasting.personal_rating = new_rating
+            updated = True
 
-        region_primary = clean_text(record.get("Region"))
-        region_secondary = clean_text(record.get("SubRegion")) or clean_text(record.get("Appellation"))
-        region_id = self.region_repo.get_or_create(
-            region_primary,
-            parse_country(record.get("Country")),
-            region_secondary,
-        )
+        # Merge tasting notes (append with date stamp)
+        new_notes = self._extract_tasting_notes_from_note(record, tasting.tasting_notes or "", tasting_date_str)
+        if new_notes != tasting.tasting_notes:
+            tasting.tasting_notes = new_notes
+            updated = True
 
-        q_purchased = int(record.get("PurchasedCommunity", 0) or 0)
-        q_quantity = int(record.get("QuantityCommunity", 0) or 0)
-        q_consumed = int(record.get("ConsumedCommunity", 0) or 0)
+        # Update tasting date (keep most recent)
+        if tasting_date_str:
+            tasting_date = date.fromisoformat(tasting_date_str)
+            if not tasting.last_tasted_date or tasting_date > tasting.last_tasted_date:
+                tasting.last_tasted_date = tasting_date
+                updated = True
 
-        drink_from_year, drink_to_year = parse_drinking_window(
-            record.get("BeginConsume"),
-            record.get("EndConsume")
-        )
+        is_defective = record.get("Defective", False)
+        if is_defective and not tasting.is_defective:
+            tasting.is_defective = True
+            updated = True
+
+        return updated
+
+
+    def _get_wine_object_from_inventory_record(self, record: Dict) -> Wine:
+        """
+        Create a Wine object from an inventory record with `_WINE_CONVERTERS` applied.
+        """
+        (
+            iwine, wine_name, vintage, wine_type, producer, country, locale, region, sub_region, appellation,
+            varietal, designation, vineyard, size, begin_consume, end_consume, q_purchased, q_quantity, q_consumed,
+        ) = map(record.get, _WINE_FIELDS)
+
+        producer_id = self._resolve_producer(producer, country, locale)
+        region_id = self._resolve_region(region, country, sub_region or appellation)
+
+        drink_from_year, drink_to_year = parse_drinking_window(begin_consume, end_consume)
+        bottle_size = size or "750ml"
+        q_purchased, q_quantity, q_consumed = int(q_purchased or 0), int(q_quantity or 0), int(q_consumed or 0)
 
         return Wine(
             source="cellar_tracker",
@@ -336,114 +807,101 @@ class CellarTrackerImporter:
             producer_id=producer_id,
             vintage=vintage,
             wine_type=wine_type,
-            varietal=clean_text(record.get("Varietal")),
-            designation=clean_text(record.get("Designation")),
+            varietal=varietal,
+            designation=designation,
             region_id=region_id,
-            appellation=clean_text(record.get("Appellation")),
-            vineyard=clean_text(record.get("Vineyard")),
-            bottle_size=record.get("Size", "750ml"),
+            appellation=appellation,
+            vineyard=vineyard,
+            bottle_size=bottle_size,
             drink_from_year=drink_from_year,
             drink_to_year=drink_to_year,
             q_purchased=q_purchased,
             q_quantity=q_quantity,
-            q_consumed=q_consumed
+            q_consumed=q_consumed,
+            content_hash=content_hash(
+                iwine, wine_name, producer_id, vintage, wine_type, varietal, designation, region_id, appellation,
+                vineyard, bottle_size, drink_from_year, drink_to_year, q_purchased, q_quantity, q_consumed,
+            ),
         )
 
     @staticmethod
     def _get_bottle_object_from_inventory_record(record: Dict, wine_id: int) -> Bottle:
         """
-        Create a Bottle object from an inventory record.
+        Create a Bottle object from an inventory record with `_INVENTORY_CONVERTERS` applied.
 
         Args:
-            record: Inventory CSV record
+            record: Converted inventory CSV record
             wine_id: Wine ID
         """
-        purchase_price = None
-        price_str = record.get("Price")
-        if price_str:
-            try:
-                purchase_price = float(price_str)
-            except (ValueError, TypeError):
-                logger.warning(f"Could not parse price '{price_str}' in record: {record.get('Barcode')}")
+        (
+            price_str, valuation_str, barcode, location, bin_, purchase_date, bottle_note, currency, store_name,
+        ) = map(record.get, _INVENTORY_BOTTLE_FIELDS)
 
-        valuation_price = None
-        valuation_str = record.get("Valuation")
-        if valuation_str:
-            try:
-                valuation_price = float(valuation_str)
-            except (ValueError, TypeError):
-                logger.warning(f"Could not parse valuation '{valuation_str}' in record: {record.get('Barcode')}")
+        purchase_price = _safe_float(price_str)
+        if price_str and purchase_price is None:
+            logger.warning(f"Could not parse price '{price_str}' in record: {barcode}")
+
+        valuation_price = _safe_float(valuation_str)
+        if valuation_str and valuation_price is None:
+            logger.warning(f"Could not parse valuation '{valuation_str}' in record: {barcode}")
 
         return Bottle(
             wine_id=wine_id,
             source="cellar_tracker",
-            external_bottle_id=record.get("Barcode"),
-            location=clean_text(record.get("Location")),
-            bin=clean_text(record.get("Bin")),
-            purchase_date=parse_date(record.get("PurchaseDate")),
-            bottle_note=clean_text(record.get("BottleNote")),
+            external_bottle_id=barcode,
+            location=location,
+            bin=bin_,
+            purchase_date=purchase_date,
+            bottle_note=bottle_note,
             purchase_price=purchase_price,
             valuation_price=valuation_price,
-            currency=record.get("Currency", "RON"),
-            store_name=clean_text(record.get("StoreName"))
+            currency="RON" if "Currency" not in record else currency,
+            store_name=store_name,
+            content_hash=content_hash(
+                wine_id, price_str, valuation_str, barcode, location, bin_, purchase_date, bottle_note, currency,
+                store_name,
+            ),
         )
 
 
     def _get_bottle_object_from_bottles_record(self, record: Dict, wine_id: int) -> Bottle:
         """
-        Create or update Bottle from bottles.csv record.
+        Create or update Bottle from bottles.csv record with `_BOTTLE_CONVERTERS` applied.
 
         Args:
-            record: Bottles CSV record
+            record: Converted bottles CSV record
             wine_id: Wine ID
         """
-        barcode = record.get("Barcode")
-        quantity = int(record.get("Quantity", 1))
-        bottle_state = record.get("BottleState", "1")
-        consumption_date = record.get("ConsumptionDate")
-
-        if bottle_state == "1" or (bottle_state == "0" and not consumption_date):
-            status = "in_cellar"
-        elif consumption_date:
-            short_type = record.get("ShortType", "").lower()
-            if "gift" in short_type:
-                status = "gifted"
-            elif "spoil" in short_type or "dump" in short_type:
-                status = "lost"
-            else:
-                status = "consumed"
-        else:
-            status = "in_cellar"
+        (
+            barcode, quantity, bottle_state, consumption_date, short_type, purchase_date, price_str,
+            purchase_note, consumption_note, location, bin_, currency, store,
+        ) = map(record.get, _BOTTLE_FIELDS)
 
-        purchase_date = parse_date(record.get("PurchaseDate"))
-        consumed_date = parse_date(consumption_date) if consumption_date else None
-
-        purchase_price = None
-        price_str = record.get("BottleCost")
-        if price_str:
-            try:
-                purchase_price = float(price_str)
-            except (ValueError, TypeError):
-                logger.warning(f"Could not parse bottle cost '{price_str}' for {barcode}")
+        # Only a missing BottleState, Quantity or currency takes the default, empty values are kept as exported
+        status = _bottle_status("1" if bottle_state is None else bottle_state, bool(consumption_date), short_type)
 
-        purchase_note = clean_text(record.get("PurchaseNote"))
-        consumption_note = clean_text(record.get("ConsumptionNote"))
-        bottle_note = self._merge_bottle_notes(purchase_note, consumption_note)
+        purchase_price = _safe_float(price_str)
+        if price_str and purchase_price is None:
+            logger.warning(f"Could not parse bottle cost '{price_str}' for {barcode}")
 
         return Bottle(
             wine_id=wine_id,
             source="cellar_tracker",
             external_bottle_id=barcode,
-            quantity=quantity,
+            quantity=1 if quantity is None else int(quantity),
             status=status,
-            location=clean_text(record.get("Location")),
-            bin=clean_text(record.get("Bin")),
+            location=location,
+            bin=bin_,
             purchase_date=purchase_date,
             purchase_price=purchase_price,
-            currency=record.get("BottleCostCurrency", "RON"),
-            store_name=clean_text(record.get("Store")),
-            consumed_date=consumed_date,
-            bottle_note=bottle_note
+            currency="RON" if "BottleCostCurrency" not in record else currency,
+            store_name=store,
+            consumed_date=parse_date(consumption_date) if consumption_date else None,
+            bottle_note=self._merge_bottle_notes(purchase_note, consumption_note),
+            content_hash=content_hash(
+                wine_id, barcode, quantity, status, location, bin_, purchase_date, price_str, currency, store,
+                consumption_date, purchase_note, consumption_note,
+            ),
         )
 
 
@@ -465,14 +923,15 @@ class CellarTrackerImporter:
                 logger.warning(f"Failed to convert rating '{rating_str}' to int: {e}")
         return None
 
-    @staticmethod
-    def _extract_tasting_notes_from_note(record: Dict, existing_notes: str) -> str:
-        """Extract and merge tasting notes from note record with date stamps."""
-        tasting_date = parse_date(record.get("TastingDate"))
+    def _extract_tasting_notes_from_note(self, record: Dict, existing_notes: str, tasting_date: Optional[str]) -> str:
+        """
+        Extract and merge tasting notes from note record with date stamps (`tasting_date` as YYYY-MM-DD,
+        undated notes are stamped with the day the notes phase started).
+        """
         note_text = clean_text(record.get("TastingNotes"))
 
         if note_text:
-            date_str = tasting_date if tasting_date else datetime.now().strftime('%Y-%m-%d')
+            date_str = tasting_date or self._today
             new_note_entry = f"[{date_str}] {note_text}"
 
             # Check if this exact note already exists in existing_notes
@@ -1,12 +1,13 @@
 """CLI script to import cellar-data from CellarTracker."""
 import argparse
+import sqlite3
 import sys
 import os
 import traceback
 from dotenv import load_dotenv
 
 from src.etl.cellartracker_importer import CellarTrackerImporter
-from src.database.db import initialize_database
+from src.database.db import initialize_database, remove_duplicate_bottles
 from src.utils import find_project_root
 from src.utils.logger import logger
 
@@ -37,6 +38,12 @@ def main():
         help='Initialize database schema before import'
     )
 
+    parser.add_argument(
+        '--remove-duplicate-bottles',
+        action='store_true',
+        help='Delete bottles imported more than once (keeping the first) before import'
+    )
+
     args = parser.parse_args()
     args.db_path = f"{find_project_root()}/{args.db_path}"
     load_dotenv()
@@ -48,10 +55,20 @@ def main():
         logger.error("CellarTracker credentials required!")
         sys.exit(1)
 
+    if args.remove_duplicate_bottles:
+        try:
+            remove_duplicate_bottles(args.db_path)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove duplicate bottles: {e}")
+            sys.exit(1)
+
     # Initialize database if requested
     if args.init_db:
         logger.info("Initializing database schema...")
-        success =  initialize_database(args.db_path)
+        try:
+            success = initialize_database(args.db_path)
+        except ValueError:
+            success = False
         if not success:
             logger.error("Failed to initialize database")
             sys.exit(1)
@@ -78,6 +95,7 @@ def main():
         print(f"\nProducers created:    {stats['producers_created']}")
         print(f"Regions created:      {stats['regions_created']}")
         print(f"Notes processed:      {stats['notes_processed']}")
+        print(f"  - Skipped:          {stats.get('notes_skipped', 0)}")
         print(f"\nErrors:               {len(stats['errors'])}")
         print("="*60)
 
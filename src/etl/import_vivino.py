@@ -1,6 +1,5 @@
 """CLI tool for importing Vivino cellar-data."""
 import sys
-from pathlib import Path
 
 from src.etl.vivino_importer import VivinoImporter
 from src.utils import get_project_root
@@ -10,11 +9,13 @@ from src.utils.logger import logger
 def main():
     """Import Vivino CSV cellar-data into wine cellar database."""
 
-    cellar_csv = get_project_root() / "cellar-data/vivino/cellar.csv"
-    full_wine_list_csv = get_project_root() / "cellar-data/vivino/full_wine_list.csv"
+    vivino_dir = get_project_root() / "cellar-data/vivino"
+    cellar_csv = vivino_dir / "cellar.csv"
+    full_wine_list_csv = vivino_dir / "full_wine_list.csv"
 
-    if not (Path(cellar_csv).exists() and Path(full_wine_list_csv).exists()):
-        logger.error(f"Vivino csv files not found: {cellar_csv}, {full_wine_list_csv}")
+    missing = [str(path) for path in (cellar_csv, full_wine_list_csv) if not path.is_file()]
+    if missing:
+        logger.error(f"Vivino csv files not found: {', '.join(missing)}")
         sys.exit(1)
 
     importer = VivinoImporter()
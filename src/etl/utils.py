@@ -2,8 +2,10 @@
 import html
 import hashlib
 from difflib import SequenceMatcher
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from dateutil import parser
 
 
@@ -37,6 +39,7 @@ COUNTRY_MAP = {
 }
 
 
+@lru_cache(maxsize=256)
 def normalize_wine_type(type_str: str) -> str:
     """
     Standardize wine type to unified format.
@@ -47,37 +50,46 @@ def normalize_wine_type(type_str: str) -> str:
     return WINE_TYPE_MAP.get(type_str.strip(), "Red")
 
 
+@lru_cache(maxsize=32768)
 def clean_text(text: str) -> str | None:
     """
     Clean and normalize text.
     """
-    if not text or text.strip() == "" or text.strip().lower() == "unknown":
+    if not text:
         return None
-    text = html.unescape(text)
     text = text.strip()
+    if not text or text.lower() == "unknown":
+        return None
+    text = html.unescape(text).strip()
 
     return text if text else None
 
 
+@lru_cache(maxsize=1024)
 def parse_country(country_str: str) -> str | None:
     """
     Parse country name from various formats.
     """
-    if not country_str or country_str.strip() == "":
-        return None
     country_str = clean_text(country_str)
-    if country_str in COUNTRY_MAP.keys():
-        return COUNTRY_MAP[country_str]
-    return country_str
+    return COUNTRY_MAP.get(country_str, country_str)
 
 
+@lru_cache(maxsize=8192)
 def parse_date(date_str: str) -> str | None:
     """
-    Parse various date formats to YYYY-MM-DD.
+    Parse various date formats to YYYY-MM-DD. Results are cached, since exports repeat the same dates a lot.
     """
     if not date_str:
         return None
 
+    # Most exports already use ISO dates (CellarTracker) or timestamps (Vivino scan dates),
+    # which don't need dateutil's format guessing
+    if len(date_str) >= 10 and date_str[4] == "-" and date_str[7] == "-":
+        try:
+            return datetime.fromisoformat(date_str).date().isoformat()
+        except ValueError:
+            pass
+
     try:
         dt = parser.parse(date_str)
         return dt.strftime('%Y-%m-%d')
@@ -101,6 +113,7 @@ def parse_vintage(vintage_str: str) -> Optional[int]:
         return None
 
 
+@lru_cache(maxsize=1024)
 def parse_drinking_window(window_str: str, end_str: str | None = None) -> tuple[Optional[int], Optional[int]]:
     """
     Parse drinking window from various formats.
@@ -209,6 +222,57 @@ def normalize_rating(rating: float, source: str) -> int | None:
     return None
 
 
+def _vivino_rating(rating: int) -> float:
+    """Vivino rating of a normalized rating in 0-100, by reverse interval mapping."""
+    if rating < 70:
+        # Below our mapping range, extrapolate
+        vivino_rating = (rating / 70) * 2.9
+    elif rating < 80:
+        # 70-79 -> 0-2.9
+        vivino_rating = 0.0 + ((rating - 70) / 9) * 2.9
+    elif rating < 86:
+        # 80-85 -> 3.0-3.5
+        vivino_rating = 3.0 + ((rating - 80) / 5) * 0.5
+    elif rating < 90:
+        # 86-89 -> 3.6-3.9
+        vivino_rating = 3.6 + ((rating - 86) / 4) * 0.4
+    elif rating < 94:
+        # 90-93 -> 4.0-4.4
+        vivino_rating = 4.0 + ((rating - 90) / 4) * 0.5
+    elif rating < 98:
+        # 94-97 -> 4.5-4.7
+        vivino_rating = 4.5 + ((rating - 94) / 4) * 0.3
+    else:
+        # 98-100 -> 4.8-5.0
+        vivino_rating = 4.8 + ((rating - 98) / 2) * 0.2
+
+    # Round to 1 decimal place (typical Vivino precision)
+    return round(vivino_rating, 1)
+
+
+def _rating_description(score: int) -> str:
+    """Quality tier of a score in 0-100."""
+    if score < 70:
+        return "Below Average"
+    elif score < 80:
+        return "Average"
+    elif score < 86:
+        return "Good"
+    elif score < 90:
+        return "Very Good"
+    elif score < 94:
+        return "Excellent"
+    elif score < 98:
+        return "Outstanding"
+    else:
+        return "Exceptional"
+
+
+# Both mappings only depend on an integer score in 0-100, so they are tabulated once
+_VIVINO_RATINGS = tuple(_vivino_rating(rating) for rating in range(101))
+_RATING_DESCRIPTIONS = tuple(_rating_description(score) for score in range(101))
+
+
 def denormalize_rating(normalized_rating: int) -> float | None:
     """
     Convert normalized 0-100 rating back to Vivino's 0-5 scale.
@@ -231,36 +295,8 @@ def denormalize_rating(normalized_rating: int) -> float | None:
         return None
 
     try:
-        rating_int = int(normalized_rating)
-
         # Clamp to valid range
-        rating_int = max(0, min(100, rating_int))
-
-        # Apply reverse interval mapping
-        if rating_int < 70:
-            # Below our mapping range, extrapolate
-            vivino_rating = (rating_int / 70) * 2.9
-        elif rating_int < 80:
-            # 70-79 -> 0-2.9
-            vivino_rating = 0.0 + ((rating_int - 70) / 9) * 2.9
-        elif rating_int < 86:
-            # 80-85 -> 3.0-3.5
-            vivino_rating = 3.0 + ((rating_int - 80) / 5) * 0.5
-        elif rating_int < 90:
-            # 86-89 -> 3.6-3.9
-            vivino_rating = 3.6 + ((rating_int - 86) / 4) * 0.4
-        elif rating_int < 94:
-            # 90-93 -> 4.0-4.4
-            vivino_rating = 4.0 + ((rating_int - 90) / 4) * 0.5
-        elif rating_int < 98:
-            # 94-97 -> 4.5-4.7
-            vivino_rating = 4.5 + ((rating_int - 94) / 4) * 0.3
-        else:
-            # 98-100 -> 4.8-5.0
-            vivino_rating = 4.8 + ((rating_int - 98) / 2) * 0.2
-
-        # Round to 1 decimal place (typical Vivino precision)
-        return round(vivino_rating, 1)
+        return _VIVINO_RATINGS[max(0, min(100, int(normalized_rating)))]
     except (ValueError, TypeError):
         return None
 
@@ -288,21 +324,8 @@ def get_rating_description(rating: int | float | None) -> str:
 
     try:
         score = int(rating) if isinstance(rating, float) else rating
-
-        if score < 70:
-            return "Below Average"
-        elif score < 80:
-            return "Average"
-        elif score < 86:
-            return "Good"
-        elif score < 90:
-            return "Very Good"
-        elif score < 94:
-            return "Excellent"
-        elif score < 98:
-            return "Outstanding"
-        else:
-            return "Exceptional"
+        # Scores outside 0-100 fall in the lowest or highest tier
+        return _RATING_DESCRIPTIONS[max(0, min(100, score))]
     except (ValueError, TypeError):
         return "Not Rated"
 
@@ -313,8 +336,8 @@ def generate_external_id(winery: str, wine_name: str, vintage: int | None) -> st
     """
     vintage_str = str(vintage) if vintage else "NV"
     key = f"{winery}_{wine_name}_{vintage_str}".lower()
-    md5_hash = hashlib.md5(key.encode()).hexdigest()
-    return str(int(md5_hash, 16) % (2**32))
+    # The low 32 bits of the digest, as int(hexdigest, 16) % 2**32 gave for existing IDs
+    return str(int.from_bytes(hashlib.md5(key.encode()).digest()[-4:], "big"))
 
 
 def parse_float(value: str) -> Optional[float]:
@@ -356,4 +379,45 @@ def parse_bool(value: str) -> Optional[bool]:
         return True
     elif value_lower in ['false', '0']:
         return False
-    return None
\ No newline at end of file
+    return None
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Split an iterable into lists of at most `size` items, consuming it lazily.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def content_hash(*values) -> str:
+    """
+    Fingerprint a record's values, used to skip re-importing unchanged rows.
+    """
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+
+def convert_columns(records: List[Dict], converters: Dict[str, Callable]) -> List[Dict]:
+    """
+    Apply per-column converters to a batch of records, one column at a time.
+
+    Each distinct raw value of a column is converted only once per batch, so heavily
+    repeated values (producers, regions, locations, dates) are not re-parsed per record.
+
+    Args:
+        records: Batch of records keyed by column name
+        converters: Mapping of column name to converter function
+
+    Returns:
+        Copies of the records with the converted columns replaced
+    """
+    converted = [dict(record) for record in records]
+    for column, convert in converters.items():
+        cache = {}
+        for record in converted:
+            raw = record.get(column)
+            if raw not in cache:
+                cache[raw] = convert(raw)
+            record[column] = cache[raw]
+    return converted
@@ -1,7 +1,9 @@
 """Vivino CSV importer for wine cellar database."""
 import csv
+import sqlite3
 from pathlib import Path
 
+from src.database import connect
 from src.database.models import Wine, Bottle, Tasting
 from src.database.repository import (
     ProducerRepository, RegionRepository, WineRepository, BottleRepository, TastingRepository
@@ -36,6 +38,9 @@ class VivinoImporter:
         self.wine_repository = WineRepository(self.db_path)
         self.bottle_repository = BottleRepository(self.db_path)
         self.tasting_repository = TastingRepository(self.db_path)
+        self.conn = None
+        # Bottles to write once all wines are processed, with whether their wine already existed
+        self._bottles: list[tuple[Bottle, bool]] = []
 
         self.stats = {
             'wines_processed': 0,
@@ -66,7 +71,7 @@ class VivinoImporter:
             # Group rows by wine (same wine may appear multiple times with different scans)
             wines_data = {}
 
-            with open(csv_path, "r", encoding="utf-8") as f:
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
                 reader = csv.DictReader(f)
 
                 for row in reader:
@@ -101,16 +106,32 @@ class VivinoImporter:
                     if review:
                         wines_data[key]["reviews"].append(review)
 
-            # Process each unique wine
-            for key, data in wines_data.items():
-                self.stats["wines_processed"] += 1
-
-                try:
-                    self._process_full_wine_list_data(data)
-                except Exception as e:
-                    error_msg = f"Error processing wine {key}: {e}"
-                    logger.error(error_msg)
-                    self.stats["errors"].append(error_msg)
+            # Process each unique wine on one connection, committed once at the end; the
+            # bottles only reference their wine and tasting, so they are written together
+            self.conn = connect(self.db_path, bulk=True)
+            self._bottles = []
+            counts = {name: count for name, count in self.stats.items() if name != "errors"}
+            try:
+                for key, data in wines_data.items():
+                    self.stats["wines_processed"] += 1
+
+                    try:
+                        self._process_full_wine_list_data(data)
+                    except Exception as e:
+                        error_msg = f"Error processing wine {key}: {e}"
+                        logger.error(error_msg)
+                        self.stats["errors"].append(error_msg)
+
+                self._write_bottles()
+                self.conn.commit()
+            except Exception:
+                # Nothing of this import was committed, so none of it is reported as imported
+                counts["wines_processed"] = self.stats["wines_processed"]
+                self.stats.update(counts)
+                raise
+            finally:
+                self.conn.close()
+                self.conn = None
 
             logger.info("Import completed.")
             return self.stats
@@ -127,24 +148,25 @@ class VivinoImporter:
             self.stats["wines_skipped"] += 1
             return
 
-        # Check if wine already exists: if yes, update; if no, insert
-        if wine_record := self.wine_repository.get_by_external_id(wine_import.external_id):
-            wine_import.id = wine_record.id
-            wine_id = wine_record.id
-            self.wine_repository.update(wine_import)
-            self.stats["wines_updated"] += 1
-        elif duplicates := self.wine_repository.find_duplicates(
+        # Existing wines are updated in place, new ones are inserted unless they duplicate a wine
+        # from another source
+        wine_exists = bool(
+            self.wine_repository.get_content_hashes([wine_import.external_id], source="vivino", conn=self.conn)
+        )
+        if not wine_exists and (duplicates := self.wine_repository.find_duplicates(
             wine_import.wine_name,
             data["row"]["Winery"],
             wine_import.wine_type,
             wine_import.vintage,
-        ):
+            conn=self.conn,
+        )):
             self.stats["wines_skipped"] += 1
-            logger.debug(f"Found duplicate wines for {wine_import.wine_name} ({wine_import.vintage}): {duplicates}")
+            logger.debug("Found duplicate wines for %s (%s): %s", wine_import.wine_name, wine_import.vintage, duplicates)
             return
-        else:
-            wine_id = self.wine_repository.create(wine_import)
-            self.stats['wines_imported'] += 1
+
+        self.wine_repository.upsert_many([wine_import], conn=self.conn)
+        wine_id = wine_import.id
+        self.stats["wines_updated" if wine_exists else "wines_imported"] += 1
 
         # Create or update tasting record
         tasting_id = self._create_or_update_tasting(data, wine_id)
@@ -160,13 +182,38 @@ class VivinoImporter:
             consumed_date=self._get_last_tasted_date(data) or parse_date("2010-01-01"),
         )
 
-        if existing_bottle := self.bottle_repository.get_by_wine_and_external_id(wine_id, bottle.external_bottle_id):
-            bottle.id = existing_bottle.id
-            self.bottle_repository.update(bottle)
-            self.stats["bottles_updated"] += 1
-        else:
-            self.bottle_repository.create(bottle)
-            self.stats["bottles_imported"] += 1
+        # A wine's only Vivino bottle shares its external ID, so it exists exactly when the wine did
+        self._bottles.append((bottle, wine_exists))
+
+    def _write_bottles(self):
+        """
+        Write the collected bottles with multi-row upserts. If a statement fails (e.g. one bottle
+        violates a constraint), fall back to writing them one by one so only the offending bottles are lost.
+        """
+        # Lets a failed bulk write discard the chunks written before the failing one
+        # without rolling back the wines and tastings of the import
+        self.conn.execute("SAVEPOINT write_bottles")
+        try:
+            self.bottle_repository.upsert_many([bottle for bottle, _ in self._bottles], conn=self.conn)
+            self.conn.execute("RELEASE write_bottles")
+            written = self._bottles
+        except sqlite3.Error as e:
+            self.conn.execute("ROLLBACK TO write_bottles")
+            self.conn.execute("RELEASE write_bottles")
+            logger.debug(f"Bulk write of {len(self._bottles)} bottles failed ({e}), writing one by one")
+
+            written = []
+            for bottle, wine_exists in self._bottles:
+                try:
+                    self.bottle_repository.upsert_many([bottle], conn=self.conn)
+                    written.append((bottle, wine_exists))
+                except sqlite3.Error as e:
+                    error_msg = f"Error processing bottle {bottle.external_bottle_id}: {e}"
+                    logger.error(error_msg)
+                    self.stats["errors"].append(error_msg)
+
+        for _, wine_exists in written:
+            self.stats["bottles_updated" if wine_exists else "bottles_imported"] += 1
 
     def _create_wine_object_from_data(self, data: dict) -> Wine | None:
         """Create Wine object from aggregated cellar-data (without tasting fields)."""
@@ -187,8 +234,8 @@ class VivinoImporter:
         external_id = generate_external_id(winery, wine_name, vintage)
 
         # Create producer and track if new
-        existing_producer = self.producer_repository.get_by_name(winery)
-        producer_id = self.producer_repository.get_or_create(winery, country, region)
+        existing_producer = self.producer_repository.get_by_name(winery, conn=self.conn)
+        producer_id = self.producer_repository.get_or_create(winery, country, region, conn=self.conn)
         if not existing_producer:
             self.stats['producers_created'] += 1
 
@@ -201,8 +248,10 @@ class VivinoImporter:
             secondary_region = parts[1].strip() if len(parts) > 1 else None
 
         # Create region and track if new
-        existing_region = self.region_repository.get_by_name_and_country(primary_region, country, secondary_region)
-        region_id = self.region_repository.get_or_create(primary_region, country, secondary_region)
+        existing_region = self.region_repository.get_by_name_and_country(
+            primary_region, country, secondary_region, conn=self.conn
+        )
+        region_id = self.region_repository.get_or_create(primary_region, country, secondary_region, conn=self.conn)
         if not existing_region:
             self.stats['regions_created'] += 1
 
@@ -282,7 +331,7 @@ class VivinoImporter:
             return None
 
         # Get existing tasting or create new one
-        existing_tasting = self.tasting_repository.get_latest_by_wine(wine_id)
+        existing_tasting = self.tasting_repository.get_latest_by_wine(wine_id, conn=self.conn)
 
         if existing_tasting:
             # Update existing tasting
@@ -322,8 +371,8 @@ class VivinoImporter:
                 updated = True
 
             if updated:
-                self.tasting_repository.update(existing_tasting)
-                logger.debug(f"Updated tasting for wine {wine_id}")
+                self.tasting_repository.update(existing_tasting, conn=self.conn)
+                logger.debug("Updated tasting for wine %s", wine_id)
 
             return existing_tasting.id
         else:
@@ -337,8 +386,8 @@ class VivinoImporter:
                 do_like=True if personal_rating and personal_rating >= 85 else False,
                 is_defective=False
             )
-            tasting_id = self.tasting_repository.create(tasting)
-            logger.debug(f"Created tasting for wine {wine_id}")
+            tasting_id = self.tasting_repository.create(tasting, conn=self.conn)
+            logger.debug("Created tasting for wine %s", wine_id)
             return tasting_id
 
     def _get_last_tasted_date(self, data: dict):
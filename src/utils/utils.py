@@ -1,6 +1,7 @@
 import hashlib
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
@@ -32,7 +33,12 @@ def find_project_root(marker="pyproject.toml"):
     Walks up from the current file to find the project root.
     The marker can be a file or folder like '.git' or 'pyproject.toml'
     """
-    current_path = os.path.abspath(os.getcwd())
+    return _find_project_root(os.path.abspath(os.getcwd()), marker)
+
+
+@lru_cache(maxsize=32)
+def _find_project_root(current_path: str, marker: str) -> str:
+    """Walks up from `current_path` to the first folder containing `marker`, once per start folder."""
     while current_path != os.path.dirname(current_path):
         if marker in os.listdir(current_path):
             return current_path
@@ -0,0 +1,26 @@
+"""Shared fixtures for the database and importer tests."""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import connect, initialize_database
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Path of a freshly initialized, empty wine cellar database."""
+    path = str(tmp_path / "wine_cellar.db")
+    assert initialize_database(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    """Open connection to the test database, closed after the test."""
+    conn = connect(db_path)
+    yield conn
+    conn.close()
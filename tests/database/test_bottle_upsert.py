@@ -0,0 +1,52 @@
+"""Tests for the BottleRepository bulk import methods."""
+from src.database import Bottle, Wine
+from src.database.repository import BottleRepository, WineRepository
+from src.database.repository import bottle as bottle_module
+
+
+def _bottle(wine_id: int, barcode: str | None, content_hash: str | None = "h1", **fields) -> Bottle:
+    return Bottle(
+        wine_id=wine_id, source="cellar_tracker", external_bottle_id=barcode, content_hash=content_hash, **fields
+    )
+
+
+def _create_wine(db_path, conn) -> int:
+    wine = Wine(source="cellar_tracker", external_id="1", wine_name="Wine 1")
+    WineRepository(db_path).upsert_many([wine], conn=conn)
+    return wine.id
+
+
+def test_upsert_many_merges_by_wine_and_barcode(db_path, conn):
+    wine_id = _create_wine(db_path, conn)
+    repo = BottleRepository(db_path)
+    repo.upsert_many([_bottle(wine_id, "B1", location="Cellar"), _bottle(wine_id, "B2", location="Rack")], conn=conn)
+
+    # Unchanged hash is skipped, changed hash is merged keeping stored values for blank fields
+    bottle_ids = repo.upsert_many([
+        _bottle(wine_id, "B1", location="Fridge"),
+        _bottle(wine_id, "B2", "h2", location=None, bin="A1"),
+    ], conn=conn)
+
+    assert len(bottle_ids) == 1
+    stored = {row[0]: row[1:] for row in conn.execute("SELECT external_bottle_id, location, bin FROM bottles")}
+    assert stored == {"B1": ("Cellar", None), "B2": ("Rack", "A1")}
+
+
+def test_upsert_many_always_inserts_bottles_without_barcode(db_path, conn):
+    wine_id = _create_wine(db_path, conn)
+    repo = BottleRepository(db_path)
+
+    repo.upsert_many([_bottle(wine_id, None), _bottle(wine_id, None)], conn=conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM bottles").fetchone()[0] == 2
+
+
+def test_get_content_hashes_across_queries(db_path, conn, monkeypatch):
+    wine_id = _create_wine(db_path, conn)
+    repo = BottleRepository(db_path)
+    repo.upsert_many([_bottle(wine_id, "B1"), _bottle(wine_id, "B2", "h2"), _bottle(wine_id, None)], conn=conn)
+    monkeypatch.setattr(bottle_module, "SQLITE_MAX_VARIABLES", 1)
+
+    found = repo.get_content_hashes([wine_id, wine_id + 1], conn=conn)
+
+    assert {key: value[1] for key, value in found.items()} == {(wine_id, "B1"): "h1", (wine_id, "B2"): "h2"}
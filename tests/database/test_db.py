@@ -0,0 +1,92 @@
+"""Tests for the schema upgrades of existing databases."""
+import sqlite3
+
+import pytest
+
+from src.database import connect, drop_secondary_indexes, initialize_database, remove_duplicate_bottles
+from src.database.db import SECONDARY_INDEXES
+from src.database.repository import SyncLogRepository
+
+
+@pytest.fixture
+def duplicate_bottles(db_path, conn) -> list[int]:
+    """A database from before bottle upserts, holding the same bottle twice. Returns the bottle IDs."""
+    conn.execute("DROP INDEX idx_bottles_wine_external")
+    conn.execute("INSERT INTO wines (source, external_id, wine_name, wine_type) VALUES ('cellar_tracker', '1', 'W', 'Red')")
+    for barcode, location in (("B1", "Cellar"), ("B1", "Rack"), ("B2", "Cellar"), (None, None), (None, None)):
+        conn.execute(
+            "INSERT INTO bottles (wine_id, source, external_bottle_id, location) VALUES (1, 'cellar_tracker', ?, ?)",
+            (barcode, location)
+        )
+    conn.commit()
+    return [row[0] for row in conn.execute("SELECT id FROM bottles ORDER BY id")]
+
+
+def _has_bottle_index(conn) -> bool:
+    query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_bottles_wine_external'"
+    return conn.execute(query).fetchone() is not None
+
+
+def test_initialize_refuses_to_drop_duplicate_bottles(db_path, conn, duplicate_bottles):
+    with pytest.raises(ValueError, match="Found 1 bottles .* --remove-duplicate-bottles"):
+        initialize_database(db_path)
+
+    assert [row[0] for row in conn.execute("SELECT id FROM bottles ORDER BY id")] == duplicate_bottles
+    assert not _has_bottle_index(conn)
+
+
+def test_remove_duplicate_bottles_keeps_first_then_initialize_succeeds(db_path, conn, duplicate_bottles):
+    assert remove_duplicate_bottles(db_path) == 1
+
+    rows = conn.execute("SELECT id, external_bottle_id, location FROM bottles ORDER BY id").fetchall()
+    assert [tuple(row) for row in rows] == [
+        (duplicate_bottles[0], "B1", "Cellar"),
+        (duplicate_bottles[2], "B2", "Cellar"),
+        (duplicate_bottles[3], None, None),
+        (duplicate_bottles[4], None, None),
+    ]
+    assert initialize_database(db_path)
+    assert _has_bottle_index(conn)
+
+
+def test_initialize_backfills_legacy_sync_counts(tmp_path):
+    path = str(tmp_path / "wine_cellar.db")
+    legacy = sqlite3.connect(path)
+    legacy.execute("""
+        CREATE TABLE sync_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, sync_type TEXT NOT NULL,
+            sync_started_at TIMESTAMP NOT NULL, sync_completed_at TIMESTAMP, status TEXT NOT NULL,
+            records_processed INTEGER DEFAULT 0, records_imported INTEGER DEFAULT 0, records_updated INTEGER DEFAULT 0,
+            records_skipped INTEGER DEFAULT 0, records_failed INTEGER DEFAULT 0, error_message TEXT,
+            error_details TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    legacy.execute("""
+        INSERT INTO sync_log (source, sync_type, sync_started_at, sync_completed_at, status, records_processed,
+                              records_imported, records_updated, records_skipped, records_failed)
+        VALUES ('cellar_tracker', 'full', '2024-01-01', '2024-01-01', 'success', 10, 4, 3, 2, 1)
+    """)
+    legacy.commit()
+    legacy.close()
+
+    assert initialize_database(path)
+    assert initialize_database(path)
+    repo = SyncLogRepository(path)
+    stats = {"wines_processed": 5, "bottles_processed": 2, "wines_imported": 1, "bottles_updated": 1, "errors": []}
+    repo.complete_sync_log(repo.start_sync_log(), stats, "success")
+
+    conn = connect(path)
+    rows = conn.execute("""
+        SELECT records_processed, records_imported, records_updated, records_skipped, records_failed
+        FROM sync_log_summary ORDER BY id
+    """).fetchall()
+    conn.close()
+    assert [tuple(row) for row in rows] == [(10, 4, 3, 2, 1), (7, 1, 1, 0, 0)]
+
+
+def test_initialize_recreates_dropped_secondary_indexes(db_path, conn):
+    drop_secondary_indexes(db_path)
+
+    assert initialize_database(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(SECONDARY_INDEXES) <= names
@@ -0,0 +1,79 @@
+"""Tests for the multi-row insert and upsert helpers."""
+import sqlite3
+
+import pytest
+
+from src.database import build_upsert_clause, insert_many
+from src.database import utils as db_utils
+
+
+COLUMNS = ("key", "value", "content_hash", "updated_at")
+UPSERT_CLAUSE = build_upsert_clause("items", ("key",), ("value", "content_hash", "updated_at"))
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE items (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            key             TEXT NOT NULL UNIQUE,
+            value,
+            content_hash    TEXT,
+            updated_at      TEXT
+        )
+    """)
+    yield conn.cursor()
+    conn.close()
+
+
+def _stored(cursor, key):
+    return cursor.execute("SELECT value, content_hash, updated_at FROM items WHERE key = ?", (key,)).fetchone()
+
+
+def test_insert_many_returns_ids_across_statements(cursor, monkeypatch):
+    # 3 rows per statement, so 10 rows take 4 statements
+    monkeypatch.setattr(db_utils, "SQLITE_MAX_VARIABLES", 12)
+    rows = [(f"k{i}", i, None, "t0") for i in range(10)]
+
+    returned = insert_many(cursor, "items", COLUMNS, rows, returning="key, id")
+
+    assert len(returned) == 10
+    stored = dict(cursor.execute("SELECT key, id FROM items").fetchall())
+    assert dict(returned) == stored
+
+
+def test_upsert_skips_row_with_same_hash(cursor):
+    insert_many(cursor, "items", COLUMNS, [("k", "old", "h1", "t0")], UPSERT_CLAUSE)
+
+    returned = insert_many(cursor, "items", COLUMNS, [("k", "new", "h1", "t1")], UPSERT_CLAUSE)
+
+    assert returned == []
+    assert _stored(cursor, "k") == ("old", "h1", "t0")
+
+
+def test_upsert_updates_row_with_changed_hash(cursor):
+    [(item_id,)] = insert_many(cursor, "items", COLUMNS, [("k", "old", "h1", "t0")], UPSERT_CLAUSE)
+
+    returned = insert_many(cursor, "items", COLUMNS, [("k", "new", "h2", "t1")], UPSERT_CLAUSE)
+
+    assert returned == [(item_id,)]
+    assert _stored(cursor, "k") == ("new", "h2", "t1")
+
+
+def test_upsert_without_hash_always_updates(cursor):
+    insert_many(cursor, "items", COLUMNS, [("k", "old", None, "t0")], UPSERT_CLAUSE)
+
+    returned = insert_many(cursor, "items", COLUMNS, [("k", "new", None, "t1")], UPSERT_CLAUSE)
+
+    assert len(returned) == 1
+    assert _stored(cursor, "k") == ("new", None, "t1")
+
+
+@pytest.mark.parametrize("falsy", [None, "", 0, 0.0])
+def test_upsert_keeps_stored_value_for_falsy_input(cursor, falsy):
+    insert_many(cursor, "items", COLUMNS, [("k", "old", "h1", "t0")], UPSERT_CLAUSE)
+
+    insert_many(cursor, "items", COLUMNS, [("k", falsy, "h2", "t1")], UPSERT_CLAUSE)
+
+    assert _stored(cursor, "k") == ("old", "h2", "t1")
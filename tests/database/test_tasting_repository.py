@@ -0,0 +1,68 @@
+"""Tests for the TastingRepository bulk import methods."""
+from datetime import date
+
+from src.database import Tasting, Wine
+from src.database import utils as db_utils
+from src.database.repository import TastingRepository, WineRepository
+from src.database.repository import tasting as tasting_module
+
+
+def _create_wines(db_path, conn, count: int) -> list[int]:
+    wines = [Wine(source="cellar_tracker", external_id=str(i), wine_name=f"Wine {i}") for i in range(count)]
+    WineRepository(db_path).upsert_many(wines, conn=conn)
+    return [w.id for w in wines]
+
+
+def test_create_many_returns_ids_in_order(db_path, conn, monkeypatch):
+    # A couple of tastings per statement
+    monkeypatch.setattr(db_utils, "SQLITE_MAX_VARIABLES", 30)
+    wine_ids = _create_wines(db_path, conn, 7)
+    tastings = [Tasting(wine_id=wine_id, personal_rating=80 + i) for i, wine_id in enumerate(wine_ids)]
+
+    tasting_ids = TastingRepository(db_path).create_many(tastings, conn=conn)
+
+    stored = dict(conn.execute("SELECT id, wine_id FROM tastings").fetchall())
+    assert [stored[tasting_id] for tasting_id in tasting_ids] == wine_ids
+
+
+def test_get_latest_by_wines_across_queries(db_path, conn, monkeypatch):
+    wine_ids = _create_wines(db_path, conn, 5)
+    repo = TastingRepository(db_path)
+    repo.create_many([
+        Tasting(wine_id=wine_ids[0], personal_rating=80, last_tasted_date=date(2020, 1, 1)),
+        Tasting(wine_id=wine_ids[0], personal_rating=90, last_tasted_date=date(2023, 1, 1)),
+        Tasting(wine_id=wine_ids[0], personal_rating=85, last_tasted_date=date(2021, 1, 1)),
+        Tasting(wine_id=wine_ids[3], personal_rating=88, last_tasted_date=date(2022, 1, 1)),
+    ], conn=conn)
+    monkeypatch.setattr(tasting_module, "SQLITE_MAX_VARIABLES", 2)
+
+    latest = repo.get_latest_by_wines(wine_ids, conn=conn)
+
+    assert set(latest) == {wine_ids[0], wine_ids[3]}
+    assert latest[wine_ids[0]].personal_rating == 90
+    assert latest[wine_ids[3]].personal_rating == 88
+
+
+def test_update_many(db_path, conn):
+    wine_ids = _create_wines(db_path, conn, 3)
+    repo = TastingRepository(db_path)
+    tastings = [Tasting(wine_id=wine_id, personal_rating=80) for wine_id in wine_ids]
+    for tasting, tasting_id in zip(tastings, repo.create_many(tastings, conn=conn)):
+        tasting.id = tasting_id
+    tastings[0].personal_rating = 91
+    tastings[1].tasting_notes = "Long finish"
+
+    assert repo.update_many(tastings[:2], conn=conn) == 2
+
+    stored = {row[0]: row[1:] for row in conn.execute("SELECT wine_id, personal_rating, tasting_notes FROM tastings")}
+    assert stored == {wine_ids[0]: (91, None), wine_ids[1]: (80, "Long finish"), wine_ids[2]: (80, None)}
+
+
+def test_note_hashes_roundtrip(db_path, conn):
+    repo = TastingRepository(db_path)
+    repo.save_note_hashes([("n1", "h1"), ("n2", "h2")], conn=conn)
+    repo.save_note_hashes([("n2", "h3")], conn=conn)
+    repo.save_note_hashes([("n1", "v1")], source="vivino", conn=conn)
+
+    assert repo.get_note_hashes(conn=conn) == {"n1": "h1", "n2": "h3"}
+    assert repo.get_note_hashes(source="vivino", conn=conn) == {"n1": "v1"}
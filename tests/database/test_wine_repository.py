@@ -0,0 +1,78 @@
+"""Tests for the WineRepository bulk import methods."""
+from src.database import Producer, Wine
+from src.database import utils as db_utils
+from src.database.repository import ProducerRepository, WineRepository
+from src.database.repository import wine as wine_module
+from src.database.utils import calculate_similarity
+
+
+def _wine(external_id: str, content_hash: str | None = "h1", **fields) -> Wine:
+    fields.setdefault("wine_name", f"Wine {external_id}")
+    return Wine(source="cellar_tracker", external_id=external_id, content_hash=content_hash, **fields)
+
+
+def test_upsert_many_sets_ids_across_statements(db_path, conn, monkeypatch):
+    # A handful of wines per statement
+    monkeypatch.setattr(db_utils, "SQLITE_MAX_VARIABLES", 100)
+    wines = [_wine(str(i)) for i in range(25)]
+
+    wine_ids = WineRepository(db_path).upsert_many(wines, conn=conn)
+
+    stored = dict(conn.execute("SELECT external_id, id FROM wines").fetchall())
+    assert wine_ids == stored
+    assert {w.external_id: w.id for w in wines} == stored
+
+
+def test_upsert_many_skips_unchanged_wines(db_path, conn):
+    repo = WineRepository(db_path)
+    repo.upsert_many([_wine("1", wine_type="Red"), _wine("2", wine_type="Red")], conn=conn)
+
+    wine_ids = repo.upsert_many([_wine("1", wine_type="White"), _wine("2", "h2", wine_type="White")], conn=conn)
+
+    assert list(wine_ids) == ["2"]
+    stored = dict(conn.execute("SELECT external_id, wine_type FROM wines").fetchall())
+    assert stored == {"1": "Red", "2": "White"}
+
+
+def test_get_content_hashes_across_queries(db_path, conn, monkeypatch):
+    repo = WineRepository(db_path)
+    repo.upsert_many([_wine(str(i), f"h{i}") for i in range(12)], conn=conn)
+    monkeypatch.setattr(wine_module, "SQLITE_MAX_VARIABLES", 5)
+
+    found = repo.get_content_hashes([str(i) for i in range(15)], conn=conn)
+
+    assert set(found) == {str(i) for i in range(12)}
+    assert all(found[str(i)][1] == f"h{i}" for i in range(12))
+    assert repo.get_content_hashes(["1"], source="vivino", conn=conn) == {}
+
+
+def test_find_duplicates_matches_unpruned_scoring(db_path, conn):
+    producers = [Producer(name="Domaine Leflaive"), Producer(name="Domaine Leroy"), Producer(name="Chateau Margaux")]
+    ProducerRepository(db_path).create_many(producers, conn=conn)
+    candidates = [
+        ("Puligny-Montrachet", 0, 2019),
+        ("Puligny-Montrachet", 0, 2018),
+        ("Puligny Montrachet", 1, 2019),
+        ("Batard-Montrachet", 0, 2019),
+        ("Pavillon Rouge", 2, 2019),
+        ("Puligny-Montrachet", 0, None),
+    ]
+    repo = WineRepository(db_path)
+    repo.upsert_many([
+        _wine(str(i), wine_name=name, producer_id=producers[p].id, vintage=vintage, wine_type="White")
+        for i, (name, p, vintage) in enumerate(candidates)
+    ], conn=conn)
+
+    matches = repo.find_duplicates("Puligny-Montrachet", "Domaine Leflaive", "White", 2019, conn=conn)
+
+    # Full score of every candidate, without the early exits
+    expected = []
+    for name, p, vintage in candidates:
+        score = (30 if vintage == 2019 else 0) \
+            + calculate_similarity("Domaine Leflaive", producers[p].name) * 30 \
+            + calculate_similarity("Puligny-Montrachet", name) * 40
+        if score >= 85:
+            expected.append((name, round(score, 6)))
+    assert [(m[2], round(m[1], 6)) for m in matches] == sorted(expected, key=lambda m: m[1], reverse=True)
+    assert matches[0][2] == "Puligny-Montrachet" and matches[0][4] == 2019
+    assert repo.find_duplicates("Puligny-Montrachet", "Domaine Leflaive", "Red", 2019, conn=conn) == []
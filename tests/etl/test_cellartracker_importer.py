@@ -0,0 +1,230 @@
+"""Tests for the CellarTracker importer, run against exports served from memory."""
+import csv
+import io
+import sqlite3
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+from cellartracker import cellartracker
+
+from src.database.db import SECONDARY_INDEXES
+from src.database.repository import TastingRepository
+from src.etl import cellartracker_importer
+from src.etl.cellartracker_importer import CellarTrackerImporter
+
+
+WINE = {
+    "iWine": "1", "Wine": "Domaine X Cuvee", "Vintage": "2018", "Type": "Red", "Producer": "Domaine X",
+    "Country": "France", "Locale": "", "Region": "Burgundy", "SubRegion": "", "Appellation": "",
+    "Varietal": "Pinot Noir", "Designation": "", "Vineyard": "", "Size": "750ml", "BeginConsume": "2020",
+    "EndConsume": "2030", "PurchasedCommunity": "5", "QuantityCommunity": "3", "ConsumedCommunity": "2",
+}
+BOTTLE = {
+    **WINE, "Barcode": "B1", "Quantity": "1", "BottleState": "1", "ConsumptionDate": "", "ShortType": "",
+    "PurchaseDate": "2021-03-04", "BottleCost": "12.5", "BottleCostCurrency": "RON", "PurchaseNote": "",
+    "ConsumptionNote": "", "Location": "Cellar", "Bin": "A1", "Store": "",
+}
+INVENTORY = {
+    **WINE, "Barcode": "B1", "Location": "Cellar", "Bin": "A1", "PurchaseDate": "2021-03-04", "BottleNote": "",
+    "Price": "12.5", "Valuation": "", "Currency": "RON", "StoreName": "",
+}
+NOTE = {
+    "iNote": "N1", "iWine": "1", "TastingDate": "2023-05-06", "Rating": "90", "TastingNotes": "Good",
+    "Defective": "False", "fLikeIt": "True", "CScore": "89.5", "LikeVotes": "3", "LikePercent": "75",
+}
+
+
+class FakeExportClient:
+    """Serves CellarTracker tables as tab-separated exports, like CellarTrackerClient.get."""
+
+    def __init__(self, tables: dict[str, list[dict]]):
+        self.tables = tables
+
+    def get(self, table, format):
+        rows = self.tables.get(table.value, [])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, list(dict.fromkeys(k for row in rows for k in row)), dialect="excel-tab")
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+
+class FakeCellarTracker(cellartracker.CellarTracker):
+    """CellarTracker whose exports are served by FakeExportClient."""
+
+    def __init__(self, tables: dict[str, list[dict]]):
+        self.client = FakeExportClient(tables)
+
+
+def run_import(db_path: str, **tables) -> dict:
+    importer = CellarTrackerImporter("user", "password", db_path)
+    importer.client = FakeCellarTracker({
+        "Inventory": tables.get("inventory", []), "Availability": [], "Bottles": tables.get("bottles", []),
+        "Notes": tables.get("notes", []),
+    })
+    return importer.import_all()
+
+
+class LazyExecutor:
+    """Stands in for ThreadPoolExecutor, running each submitted call only when its result is asked for."""
+
+    def __init__(self, max_workers: int):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        return SimpleNamespace(result=partial(fn, *args))
+
+
+@pytest.fixture
+def importer(db_path):
+    return CellarTrackerImporter("user", "password", db_path)
+
+
+def test_reimport_skips_unchanged_records(db_path, conn):
+    first = run_import(db_path, inventory=[INVENTORY], bottles=[BOTTLE], notes=[NOTE])
+    second = run_import(db_path, inventory=[INVENTORY], bottles=[BOTTLE], notes=[NOTE])
+
+    assert first["errors"] == [] and second["errors"] == []
+    assert first["wines_imported"] == 1
+    assert (second["wines_imported"], second["wines_updated"]) == (0, 0)
+    assert (second["bottles_imported"], second["bottles_updated"]) == (0, 0)
+    assert second["wines_skipped"] and second["bottles_skipped"]
+    assert second["notes_skipped"] == 1
+    assert conn.execute("SELECT COUNT(*) FROM bottles").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM tastings").fetchone()[0] == 1
+
+
+def test_exports_are_awaited_outside_the_write_lock(db_path, monkeypatch):
+    locked_during = []
+
+    class LockCheckingClient(FakeExportClient):
+        def get(self, table, format):
+            other = sqlite3.connect(db_path, timeout=0)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+                other.rollback()
+            except sqlite3.OperationalError:
+                locked_during.append(table.value)
+            finally:
+                other.close()
+            return super().get(table, format)
+
+    monkeypatch.setattr(cellartracker_importer, "ThreadPoolExecutor", LazyExecutor)
+    importer = CellarTrackerImporter("user", "password", db_path)
+    importer.client = FakeCellarTracker({})
+    importer.client.client = LockCheckingClient({"Inventory": [INVENTORY], "Notes": [NOTE]})
+
+    stats = importer.import_all()
+
+    assert stats["errors"] == []
+    assert locked_during == []
+
+
+def test_secondary_indexes_are_kept_until_the_first_export_is_in(db_path, monkeypatch):
+    missing_during = []
+
+    class IndexCheckingClient(FakeExportClient):
+        def get(self, table, format):
+            with sqlite3.connect(db_path) as other:
+                names = {row[0] for row in other.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            if not set(SECONDARY_INDEXES) <= names:
+                missing_during.append(table.value)
+            return super().get(table, format)
+
+    monkeypatch.setattr(cellartracker_importer, "ThreadPoolExecutor", LazyExecutor)
+    importer = CellarTrackerImporter("user", "password", db_path)
+    importer.client = FakeCellarTracker({})
+    importer.client.client = IndexCheckingClient({"Inventory": [INVENTORY], "Notes": [NOTE]})
+
+    stats = importer.import_all()
+
+    assert stats["errors"] == []
+    assert "Inventory" not in missing_during
+
+
+def test_import_aborts_when_initialization_fails(db_path, monkeypatch):
+    monkeypatch.setattr(cellartracker_importer, "initialize_database", lambda db_path, conn=None: False)
+    importer = CellarTrackerImporter("user", "password", db_path)
+    importer.client = FakeCellarTracker({"Inventory": [INVENTORY]})
+
+    with pytest.raises(RuntimeError):
+        importer.import_all()
+
+    assert importer.conn is None
+    with sqlite3.connect(db_path) as other:
+        assert other.execute("SELECT COUNT(*) FROM sync_log").fetchone()[0] == 0
+
+
+def test_failed_note_is_retried_next_sync(db_path, conn):
+    bad_note = {**NOTE, "Defective": ""}
+
+    first = run_import(db_path, inventory=[INVENTORY], notes=[bad_note])
+    second = run_import(db_path, inventory=[INVENTORY], notes=[bad_note])
+    third = run_import(db_path, inventory=[INVENTORY], notes=[NOTE])
+
+    assert len(first["errors"]) == 1 and len(second["errors"]) == 1
+    assert second["notes_skipped"] == 0
+    assert third["errors"] == [] and third["notes_skipped"] == 0
+    assert conn.execute("SELECT COUNT(*) FROM imported_notes").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM tastings").fetchone()[0] == 1
+
+
+def test_note_of_failed_tasting_write_is_retried_next_sync(db_path, conn, monkeypatch):
+    def fail(self, tastings, conn=None):
+        raise sqlite3.IntegrityError("constraint failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(TastingRepository, "create_many", fail)
+        first = run_import(db_path, inventory=[INVENTORY], notes=[NOTE])
+    second = run_import(db_path, inventory=[INVENTORY], notes=[NOTE])
+
+    assert len(first["errors"]) == 1
+    assert second["errors"] == [] and second["notes_skipped"] == 0
+    assert conn.execute("SELECT COUNT(*) FROM tastings").fetchone()[0] == 1
+
+
+def test_inventory_bottle_hash_covers_wine_and_fields(importer):
+    bottle = importer._get_bottle_object_from_inventory_record(INVENTORY, 1)
+
+    assert importer._get_bottle_object_from_inventory_record(dict(INVENTORY), 1).content_hash == bottle.content_hash
+    assert importer._get_bottle_object_from_inventory_record(INVENTORY, 2).content_hash != bottle.content_hash
+    for field, value in (("Price", "13"), ("Valuation", "20"), ("Location", "Rack"), ("Bin", "B2"),
+                         ("PurchaseDate", "2021-03-05"), ("BottleNote", "Gift"), ("Currency", "EUR"),
+                         ("StoreName", "Shop")):
+        changed = {**INVENTORY, field: value}
+        assert importer._get_bottle_object_from_inventory_record(changed, 1).content_hash != bottle.content_hash, field
+
+
+def test_bottles_record_hash_covers_wine_and_fields(importer):
+    bottle = importer._get_bottle_object_from_bottles_record(BOTTLE, 1)
+
+    assert importer._get_bottle_object_from_bottles_record(dict(BOTTLE), 1).content_hash == bottle.content_hash
+    assert importer._get_bottle_object_from_bottles_record(BOTTLE, 2).content_hash != bottle.content_hash
+    for field, value in (("Quantity", "2"), ("Location", "Rack"), ("Bin", "B2"), ("PurchaseDate", "2021-03-05"),
+                         ("BottleCost", "13"), ("BottleCostCurrency", "EUR"), ("Store", "Shop"),
+                         ("PurchaseNote", "Gift"), ("ConsumptionNote", "Nice")):
+        changed = {**BOTTLE, field: value}
+        assert importer._get_bottle_object_from_bottles_record(changed, 1).content_hash != bottle.content_hash, field
+
+
+def test_bottle_builders_default_only_missing_values(importer):
+    build_from_bottles = importer._get_bottle_object_from_bottles_record
+    build_from_inventory = importer._get_bottle_object_from_inventory_record
+    consumed = {**BOTTLE, "BottleState": "", "ConsumptionDate": "2023-05-06"}
+    without_state = {k: v for k, v in consumed.items() if k != "BottleState"}
+
+    assert build_from_bottles(consumed, 1).status == "consumed"
+    assert build_from_bottles({**consumed, "ShortType": "Gift"}, 1).status == "gifted"
+    assert build_from_bottles(without_state, 1).status == "in_cellar"
+
+    assert build_from_bottles({**BOTTLE, "BottleCostCurrency": ""}, 1).currency == ""
+    assert build_from_bottles({k: v for k, v in BOTTLE.items() if k != "BottleCostCurrency"}, 1).currency == "RON"
+    assert build_from_inventory({**INVENTORY, "Currency": ""}, 1).currency == ""
+    assert build_from_inventory({k: v for k, v in INVENTORY.items() if k != "Currency"}, 1).currency == "RON"
@@ -0,0 +1,63 @@
+"""Tests for the importer batch helpers."""
+from datetime import datetime
+
+from src.etl import utils
+from src.etl.utils import chunked, content_hash, convert_columns, parse_vintage
+
+
+def test_chunked_is_lazy_and_keeps_remainder():
+    consumed = []
+
+    def numbers():
+        for i in range(7):
+            consumed.append(i)
+            yield i
+
+    chunks = chunked(numbers(), 3)
+
+    assert next(chunks) == [0, 1, 2]
+    assert consumed == [0, 1, 2]
+    assert list(chunks) == [[3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_content_hash_depends_on_values_order_and_types():
+    assert content_hash("a", 1, None) == content_hash("a", 1, None)
+    assert len(content_hash("a")) == 32
+    assert content_hash("a", 1) != content_hash(1, "a")
+    assert content_hash("1") != content_hash(1)
+    assert content_hash(None) != content_hash("")
+
+
+def test_convert_columns_converts_each_distinct_value_once():
+    calls = []
+
+    def upper(value):
+        calls.append(value)
+        return value.upper() if value else None
+
+    records = [{"Producer": "a", "Wine": "x"}, {"Producer": "b", "Wine": "y"}, {"Producer": "a"}]
+
+    converted = convert_columns(records, {"Producer": upper, "Wine": upper})
+
+    assert converted == [
+        {"Producer": "A", "Wine": "X"}, {"Producer": "B", "Wine": "Y"}, {"Producer": "A", "Wine": None},
+    ]
+    assert calls == ["a", "b", "x", "y", None]
+    # The input records are left as they were
+    assert records[0] == {"Producer": "a", "Wine": "x"}
+
+
+def test_parse_vintage_bound_follows_the_current_year(monkeypatch):
+    this_year = datetime.now().year
+    assert parse_vintage("1899") is None
+    assert parse_vintage(str(this_year + 3)) is None
+
+    class NextYear(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(this_year + 1, 1, 1)
+
+    monkeypatch.setattr(utils, "datetime", NextYear)
+
+    assert parse_vintage(str(this_year + 3)) == this_year + 3
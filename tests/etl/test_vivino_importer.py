@@ -0,0 +1,65 @@
+"""Tests for the Vivino importer."""
+import csv
+import sqlite3
+from datetime import date
+
+import pytest
+
+from src.database.repository import BottleRepository
+from src.etl.vivino_importer import VivinoImporter
+
+
+HEADER = [
+    "Winery", "Wine name", "Vintage", "Region", "Country", "Wine type", "Average rating", "Scan date",
+    "Your rating", "Your review", "Personal Note", "Drinking Window",
+]
+ROWS = [
+    ["Winery A", "Wine A", "2015", "Bordeaux", "fr", "Red Wine", "3.8", "2023-01-02 10:11:12", "4.5", "Nice", "", ""],
+    ["Winery B", "Wine B", "2019", "Tuscany", "it", "Red Wine", "4.2", "2022-05-06 08:00:00", "3.0", "", "", ""],
+    ["Winery C", "Wine C", "", "Tuscany", "it", "White Wine", "", "2021-07-08 09:00:00", "", "", "", ""],
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path) -> str:
+    path = tmp_path / "full_wine_list.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def _count(conn, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_failed_bottle_keeps_the_rest_of_the_import(db_path, conn, csv_path, monkeypatch):
+    upsert_many = BottleRepository.upsert_many
+
+    def reject_bottle_b(self, bottles, conn=None):
+        if any(bottle.consumed_date == date(2022, 5, 6) for bottle in bottles):
+            raise sqlite3.IntegrityError("CHECK constraint failed")
+        return upsert_many(self, bottles, conn=conn)
+
+    monkeypatch.setattr(BottleRepository, "upsert_many", reject_bottle_b)
+
+    stats = VivinoImporter(db_path).import_full_wine_list_csv(csv_path)
+
+    assert len(stats["errors"]) == 1
+    assert (stats["wines_imported"], stats["bottles_imported"]) == (3, 2)
+    assert (_count(conn, "wines"), _count(conn, "tastings"), _count(conn, "bottles")) == (3, 2, 2)
+
+
+def test_failed_import_reports_nothing_imported(db_path, conn, csv_path, monkeypatch):
+    def fail(self):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(VivinoImporter, "_write_bottles", fail)
+
+    stats = VivinoImporter(db_path).import_full_wine_list_csv(csv_path)
+
+    assert len(stats["errors"]) == 1
+    assert stats["wines_processed"] == 3
+    assert (stats["wines_imported"], stats["bottles_imported"], stats["producers_created"]) == (0, 0, 0)
+    assert _count(conn, "wines") == 0